@@ -0,0 +1,632 @@
+#!/usr/bin/env python3
+"""
+LangChain Resume Agent batch mode
+Tailors a resume for many jobs through the asynchronous Message Batches API
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import mmap
+import time
+import queue
+import sqlite3
+import argparse
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional
+
+import anthropic
+from langchain_core.exceptions import OutputParserException
+
+from langchain_resume_agent_ui import (
+    LangChainResumeAgentUI, BulletIndex, SharedJobStore, console
+)
+
+
+class AnthropicBatchClient:
+    """Thin wrapper over the Anthropic Message Batches API"""
+
+    def __init__(self, api_key: str):
+        self.client = anthropic.Anthropic(api_key=api_key)
+
+    def submit(self, requests: List[Dict]) -> str:
+        """Create a message batch and return its ID"""
+        return self.client.messages.batches.create(requests=requests).id
+
+    def is_ended(self, batch_id: str) -> bool:
+        """Check whether every request in the batch has finished"""
+        return self.client.messages.batches.retrieve(batch_id).processing_status == "ended"
+
+    def results(self, batch_id: str) -> Iterator[Dict]:
+        """Stream results as {custom_id, text, usage, error}"""
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                error = getattr(entry.result, "error", None)
+                yield {"custom_id": entry.custom_id, "error": str(error or entry.result.type)}
+                continue
+
+            message = entry.result.message
+            yield {
+                "custom_id": entry.custom_id,
+                "text": "".join(block.text for block in message.content if block.type == "text"),
+                "usage": {"input_tokens": message.usage.input_tokens,
+                          "output_tokens": message.usage.output_tokens},
+            }
+
+
+class LocalBatchClient:
+    """In-process stand-in for the message batch endpoint, for tests and dry runs"""
+
+    def __init__(self, respond: Callable[[Dict], str], polls_until_ended: int = 1):
+        """respond receives a request's params and returns the model's text"""
+        self.respond = respond
+        self.polls_until_ended = polls_until_ended
+        self.batches: Dict[str, Dict] = {}
+
+    def submit(self, requests: List[Dict]) -> str:
+        """Queue a batch; it "finishes" after polls_until_ended polls"""
+        batch_id = f"local_batch_{len(self.batches)}"
+        self.batches[batch_id] = {"requests": requests, "polls": 0, "results": None}
+        return batch_id
+
+    def is_ended(self, batch_id: str) -> bool:
+        """Count a poll and answer every request once the batch is due"""
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        if batch["polls"] < self.polls_until_ended:
+            return False
+
+        if batch["results"] is None:
+            batch["results"] = []
+            for request in batch["requests"]:
+                try:
+                    text = self.respond(request["params"])
+                    batch["results"].append({"custom_id": request["custom_id"], "text": text,
+                                             "usage": {"input_tokens": 0, "output_tokens": 0}})
+                except Exception as e:
+                    batch["results"].append({"custom_id": request["custom_id"], "error": str(e)})
+        return True
+
+    def results(self, batch_id: str) -> Iterator[Dict]:
+        """Stream results in submission order"""
+        return iter(self.batches[batch_id]["results"])
+
+
+class BatchTailoringRunner:
+    """Runs the 4-agent pipeline for many jobs as message-batch waves, one wave per stage"""
+
+    MAX_TOKENS = 8192
+    PRICE_MULTIPLIER = 0.5  # Batch requests are billed at half the interactive price
+
+    def __init__(self, agent: LangChainResumeAgentUI, client, poll_interval: float = 60.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.agent = agent
+        self.client = client
+        self.poll_interval = poll_interval
+        self.sleep = sleep
+
+    def _request(self, custom_id: str, prompt, inputs: Dict, config: Dict) -> Dict:
+        """Turn a LangChain prompt into a Messages API batch request"""
+        messages = prompt.format_messages(**inputs)
+        return {
+            "custom_id": custom_id,
+            "params": {
+                "model": config["model"],
+                "max_tokens": self.MAX_TOKENS,
+                "temperature": config["temperature"],
+                "system": "\n\n".join(m.content for m in messages if m.type == "system"),
+                "messages": [
+                    {"role": "assistant" if m.type == "ai" else "user", "content": m.content}
+                    for m in messages if m.type != "system"
+                ],
+            },
+        }
+
+    def _run_wave(self, stage: str, prompts: Dict[str, tuple], config: Dict, parser) -> Dict:
+        """Submit one batch for a stage, wait for it to end and parse each job's result"""
+        if not prompts:
+            # Every job already failed or was served from cache; the API rejects empty batches
+            return {}
+
+        custom_ids = {f"{stage}-{i}": job_id for i, job_id in enumerate(prompts)}
+        requests = [self._request(custom_id, *prompts[job_id], config)
+                    for custom_id, job_id in custom_ids.items()]
+
+        batch_id = self.client.submit(requests)
+        console.print(f"[dim]Submitted {stage} batch {batch_id} ({len(requests)} requests, "
+                      f"{config['model']})[/dim]")
+        while not self.client.is_ended(batch_id):
+            self.sleep(self.poll_interval)
+
+        results = {}
+        for entry in self.client.results(batch_id):
+            job_id = custom_ids[entry["custom_id"]]
+            if entry.get("error"):
+                results[job_id] = RuntimeError(entry["error"])
+                continue
+
+            usage = entry.get("usage") or {}
+            self.agent.usage.record_call(stage, config["model"], 0.0,
+                                         usage.get("input_tokens", 0), usage.get("output_tokens", 0),
+                                         price_multiplier=self.PRICE_MULTIPLIER)
+            try:
+                results[job_id] = parser.parse(entry["text"])
+            except OutputParserException as e:
+                results[job_id] = e
+        return results
+
+    def _run_stage(self, stage: str, prompts: Dict[str, tuple], parser,
+                   is_confident: Optional[Callable[[Dict], bool]] = None) -> Dict:
+        """Run a stage's wave, re-batching unreliable answers on the escalation model"""
+        router = self.agent.router
+        results = self._run_wave(stage, prompts, router.config_for(stage), parser)
+
+        escalation = router.escalation_for(stage)
+        if not (is_confident and escalation and self.agent.escalate_on_low_confidence):
+            return results
+
+        retry = {job_id: prompts[job_id] for job_id, result in results.items()
+                 if isinstance(result, Exception) or not is_confident(result)}
+        if retry:
+            for _ in retry:
+                self.agent.usage.record_escalation(stage)
+            results.update(self._run_wave(stage, retry, escalation, parser))
+        return results
+
+    def _apply(self, stage: str, jobs: Dict[str, Dict], results: Dict,
+               on_result: Optional[Callable[[Dict, object], None]] = None):
+        """Store each job's result as it lands and drop failed jobs from later waves"""
+        for job_id, result in results.items():
+            job = jobs[job_id]
+            if isinstance(result, Exception):
+                job["error"] = f"{stage}: {str(result).splitlines()[0]}"
+            elif on_result:
+                on_result(job, result)
+            else:
+                job[stage] = result
+
+    def run(self, jobs: List[Dict], resume_path: str) -> List[Dict]:
+        """Tailor the resume for every job; jobs are {id, job_description, job_url}"""
+        agent = self.agent
+        resume = agent.load_resume(resume_path)
+        # Keyed by position: job IDs from scraped dumps aren't guaranteed unique
+        state = {str(i): {"id": str(job.get("id", i)),
+                          "job_description": job["job_description"],
+                          "job_url": job.get("job_url", "Manual input")}
+                 for i, job in enumerate(jobs)}
+
+        def active() -> Dict[str, Dict]:
+            return {job_id: job for job_id, job in state.items() if "error" not in job}
+
+        # Wave 1: keywords, one request per distinct posting not already in the job store
+        by_content: Dict[str, List[str]] = {}
+        for job_id, job in active().items():
+            by_content.setdefault(SharedJobStore.content_key(job["job_description"]), []).append(job_id)
+
+        prompts = {}
+        for key, job_ids in by_content.items():
+            cached = agent.job_store.get("keywords", key) if agent.job_store else None
+            if cached is not None:
+                for job_id in job_ids:
+                    state[job_id]["keywords"] = cached
+                continue
+            prompts[job_ids[0]] = (agent.keyword_agent.prompt,
+                                   {"job_description": state[job_ids[0]]["job_description"]})
+
+        results = self._run_stage("keywords", prompts, agent.keyword_agent.parser,
+                                  agent.keywords_confident)
+        for job_id, result in list(results.items()):
+            key = SharedJobStore.content_key(state[job_id]["job_description"])
+            if agent.job_store and not isinstance(result, Exception):
+                agent.job_store.put("keywords", key, result)
+            for duplicate in by_content[key][1:]:
+                results[duplicate] = result
+        self._apply("keywords", state, results)
+
+        # Wave 2: match scores
+        prompts = {job_id: (agent.match_agent.prompt, {
+                       "job_description": job["job_description"],
+                       "resume": resume,
+                       "keywords": json.dumps(job["keywords"], indent=2)})
+                   for job_id, job in active().items()}
+        self._apply("match", state, self._run_stage(
+            "match", prompts, agent.match_agent.parser, agent.match_confident))
+
+        # Wave 3: tailored resumes, reusing cached stable sections when we have them
+        tailor = agent.tailor_agent
+        stable_sections = agent.section_cache.get(resume)
+        prompts = {}
+        for job_id, job in active().items():
+            source = resume
+            if agent.bullets_per_role:
+                source = BulletIndex(resume).select(job["keywords"], agent.bullets_per_role)
+            if stable_sections:
+                prompts[job_id] = (tailor.sections_prompt, tailor.sections_inputs(
+                    job["job_description"], source, job["keywords"], job["match"]))
+            else:
+                prompts[job_id] = (tailor.prompt, tailor.resume_inputs(
+                    job["job_description"], source, job["keywords"], job["match"]))
+
+        def save_resume(job: Dict, text: str):
+            if stable_sections:
+                text = tailor.splice_sections(text, stable_sections)
+            else:
+                agent.section_cache.set(resume, text)
+            # No LLM shorten calls in batch mode; local trimming only
+            job["tailor"] = agent.page_fitter.trim(text)
+            job["pdf"] = agent.artifact_store.put(
+                "tailored_resume.pdf", agent.pdf_generator.convert_to_pdf(job["tailor"]))
+            job["md"] = agent.artifact_store.put("tailored_resume.md", job["tailor"].encode('utf-8'))
+
+        self._apply("tailor", state, self._run_stage("tailor", prompts, tailor.parser),
+                    on_result=save_resume)
+
+        # Wave 4: recruiter evaluation
+        prompts = {job_id: (agent.recruiter_agent.prompt, {
+                       "job_description": job["job_description"],
+                       "tailored_resume": job["tailor"],
+                       "match_analysis": json.dumps(job["match"], indent=2)})
+                   for job_id, job in active().items()}
+
+        def save_report(job: Dict, evaluation: Dict):
+            job["recruiter"] = evaluation
+            job["report"] = agent.artifact_store.put("resume_analysis.json", json.dumps({
+                'job_url': job["job_url"],
+                'keywords': job["keywords"],
+                'match_analysis': job["match"],
+                'recruiter_evaluation': evaluation
+            }, indent=2).encode('utf-8'))
+
+        self._apply("recruiter", state, self._run_stage(
+            "recruiter", prompts, agent.recruiter_agent.parser), on_result=save_report)
+
+        return [self.summarize(job) for job in state.values()]
+
+    @staticmethod
+    def summarize(job: Dict) -> Dict:
+        """Compact per-job result for the batch report"""
+        return {
+            "id": job["id"],
+            "job_url": job["job_url"],
+            "match_percentage": job.get("match", {}).get("overall_match_percentage"),
+            "candidacy_score": job.get("recruiter", {}).get("candidacy_score"),
+            "pdf": job.get("pdf"),
+            "report": job.get("report"),
+            "error": job.get("error"),
+        }
+
+
+class CorpusReader:
+    """Lazily reads job records from large JSONL or CSV dumps, resumable at a byte offset"""
+
+    MMAP_THRESHOLD = 64 * 1024 * 1024  # Files larger than this are read through mmap
+    RELEASE_EVERY = 16 * 1024 * 1024   # Drop consumed mmap pages so RSS stays flat
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+
+    def _lines(self, offset: int) -> Iterator[tuple]:
+        """Yield (line bytes, offset just past the line) from offset onwards"""
+        with open(self.path, 'rb') as f:
+            if os.path.getsize(self.path) < self.MMAP_THRESHOLD:
+                f.seek(offset)
+                for line in iter(f.readline, b''):
+                    offset += len(line)
+                    yield line, offset
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                mm.seek(offset)
+                released = offset - offset % mmap.PAGESIZE
+                for line in iter(mm.readline, b''):
+                    offset = mm.tell()
+                    yield line, offset
+                    if offset - released >= self.RELEASE_EVERY and hasattr(mmap, "MADV_DONTNEED"):
+                        end = offset - offset % mmap.PAGESIZE
+                        mm.madvise(mmap.MADV_DONTNEED, released, end - released)
+                        released = end
+
+    def records(self, offset: int = 0) -> Iterator[tuple]:
+        """Yield (start offset, end offset, raw record or None if unparseable)"""
+        if self.format == "jsonl":
+            start = offset
+            for line, end in self._lines(offset):
+                if line.strip():
+                    try:
+                        yield start, end, json.loads(line)
+                    except json.JSONDecodeError:
+                        yield start, end, None
+                start = end
+            return
+
+        # CSV: quoted job descriptions may span lines, so let csv pull lines and track offsets
+        position = [0]
+
+        def text_lines(from_offset: int):
+            for line, end in self._lines(from_offset):
+                position[0] = end
+                yield line.decode('utf-8', errors='replace')
+
+        header_reader = csv.reader(text_lines(0))
+        fieldnames = next(header_reader, None)
+        if fieldnames is None:
+            return
+        start = max(offset, position[0])
+
+        for row in csv.reader(text_lines(start)):
+            end = position[0]
+            if row:
+                yield start, end, dict(zip(fieldnames, row)) if len(row) == len(fieldnames) else None
+            start = end
+
+
+class DedupeIndex:
+    """On-disk set of job content hashes seen so far, so memory doesn't grow with the corpus"""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (hash TEXT PRIMARY KEY, offset INTEGER)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS seen_offset ON seen (offset)")
+        self._lock = threading.Lock()
+
+    def add(self, content_hash: str, offset: int) -> bool:
+        """Record a hash; returns False if it was already seen"""
+        with self._lock:
+            cursor = self.conn.execute("INSERT OR IGNORE INTO seen (hash, offset) VALUES (?, ?)",
+                                       (content_hash, offset))
+            return cursor.rowcount == 1
+
+    def rollback(self, offset: int):
+        """Forget hashes recorded at or after offset (they weren't checkpointed)"""
+        with self._lock:
+            self.conn.execute("DELETE FROM seen WHERE offset >= ?", (offset,))
+            self.conn.commit()
+
+    def commit(self):
+        with self._lock:
+            self.conn.commit()
+
+
+class StreamingIngestor:
+    """Streams a job corpus through the agents with bounded memory and checkpointed offsets
+
+    Records are read lazily, normalized and hash-deduplicated on the fly, and handed to
+    worker threads through a bounded queue, so a slow agent pushes back on the reader.
+    Results are appended to a JSONL file in read order as the watermark passes them, and
+    the checkpoint records both the corpus offset and the results file size, so a restart
+    truncates anything written after the last checkpoint and each record is written once.
+    """
+
+    def __init__(self, results_path: str, checkpoint_path: str, workers: int = 4,
+                 queue_size: int = 64, checkpoint_every: int = 50):
+        self.results_path = results_path
+        self.checkpoint_path = checkpoint_path
+        self.workers = workers
+        self.queue_size = queue_size
+        self.checkpoint_every = checkpoint_every
+
+        self.state: Dict = {}
+        self.dedupe: Optional[DedupeIndex] = None
+        # start -> [end, done, result line or None, failed]
+        self._pending: "OrderedDict[int, list]" = OrderedDict()
+        self._pending_limit: Optional[int] = None
+        self._cond = threading.Condition()
+        self._results_file = None
+        self._since_checkpoint = 0
+
+    @staticmethod
+    def normalize_record(raw: Optional[Dict], start: int) -> Optional[Dict]:
+        """Map common job-board field names onto {id, job_description, job_url}"""
+        if not isinstance(raw, dict):
+            return None
+        text = raw.get("job_description") or raw.get("description") or raw.get("text") or ""
+        text = '\n'.join(' '.join(line.split()) for line in str(text).splitlines())
+        text = re.sub(r'\n{3,}', '\n\n', text).strip()
+        if not text:
+            return None
+        return {
+            "id": str(raw.get("id") or raw.get("job_id") or f"offset-{start}"),
+            "job_description": text,
+            "job_url": raw.get("job_url") or raw.get("url") or "Manual input",
+        }
+
+    def _load_checkpoint(self, corpus_path: str) -> Dict:
+        fresh = {"corpus": os.path.abspath(corpus_path), "offset": 0, "processed": 0,
+                 "failed": 0, "duplicates": 0, "invalid": 0}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("corpus") == fresh["corpus"]:
+                return state
+        return fresh
+
+    def _save_checkpoint(self):
+        """Persist results, then the dedupe index, then the offset (in that order)"""
+        if self._results_file:
+            self._results_file.flush()
+            os.fsync(self._results_file.fileno())
+            self.state["results_bytes"] = os.fstat(self._results_file.fileno()).st_size
+        self.dedupe.commit()
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+        self._since_checkpoint = 0
+
+    def _track(self, start: int, end: int, done: bool):
+        """Register a record in read order; blocks while too many are outstanding"""
+        with self._cond:
+            while self._pending_limit is not None and len(self._pending) >= self._pending_limit:
+                self._cond.wait()
+            self._pending[start] = [end, done, None, False]
+            self._advance()
+
+    def _complete(self, start: int, result: Optional[Dict] = None, failed: bool = False):
+        """Mark a record done and move the checkpoint watermark"""
+        with self._cond:
+            entry = self._pending[start]
+            entry[1] = True
+            if result is not None:
+                entry[2] = json.dumps(result) + "\n"
+                entry[3] = failed
+            self._advance()
+            self._cond.notify_all()
+
+    def _advance(self):
+        """Write results for the finished prefix of pending records and move the offset past it"""
+        while self._pending:
+            start, (end, done, line, failed) = next(iter(self._pending.items()))
+            if not done:
+                break
+            self._pending.popitem(last=False)
+            if line is not None:
+                self._results_file.write(line)
+                self.state["failed" if failed else "processed"] += 1
+            self.state["offset"] = end
+            self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_every:
+            self._save_checkpoint()
+
+    def records(self, corpus_path: str) -> Iterator[tuple]:
+        """Yield (start offset, record) for new, valid, unseen records after the checkpoint"""
+        for start, end, raw in CorpusReader(corpus_path).records(self.state["offset"]):
+            record = self.normalize_record(raw, start)
+            if record is None:
+                self.state["invalid"] += 1
+                self._track(start, end, done=True)
+                continue
+            content_hash = SharedJobStore.content_key(record["job_description"])
+            if not self.dedupe.add(content_hash, start):
+                self.state["duplicates"] += 1
+                self._track(start, end, done=True)
+                continue
+            self._track(start, end, done=False)
+            yield start, record
+
+    def _open(self, corpus_path: str):
+        self.state = self._load_checkpoint(corpus_path)
+        self.dedupe = DedupeIndex(self.checkpoint_path + ".seen.db")
+        self.dedupe.rollback(self.state["offset"])
+        self._pending.clear()
+
+        # Drop results written after the last checkpoint; they are past its offset and get redone
+        size = os.path.getsize(self.results_path) if os.path.exists(self.results_path) else 0
+        kept = self.state.setdefault("results_bytes", size)
+        if size > kept:
+            os.truncate(self.results_path, kept)
+        self._results_file = open(self.results_path, 'a', encoding='utf-8')
+
+    def _close(self):
+        with self._cond:
+            self._save_checkpoint()
+        self._results_file.close()
+        self._results_file = None
+
+    def run(self, corpus_path: str, process: Callable[[Dict], Dict]) -> Dict:
+        """Process every record with worker threads; process(record) returns a result dict"""
+        self._open(corpus_path)
+        # Workers complete records out of order; cap how far reading runs ahead of the watermark
+        self._pending_limit = 4 * self.queue_size
+        work: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+
+        def worker():
+            while True:
+                item = work.get()
+                if item is None:
+                    return
+                start, record = item
+                try:
+                    self._complete(start, {"id": record["id"], **process(record)})
+                except Exception as e:
+                    self._complete(start, {"id": record["id"], "error": str(e).splitlines()[0]},
+                                   failed=True)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            for item in self.records(corpus_path):
+                work.put(item)  # Blocks when workers fall behind
+        finally:
+            for _ in threads:
+                work.put(None)
+            for thread in threads:
+                thread.join()
+            self._close()
+        return self.state
+
+    def run_chunks(self, corpus_path: str, process_chunk: Callable[[List[Dict]], List[Dict]],
+                   chunk_size: int = 1000) -> Dict:
+        """Process records in chunks (e.g. one message batch per chunk)"""
+        self._open(corpus_path)
+        # The reading thread completes each chunk itself, so a pending cap would deadlock it;
+        # at most one chunk of records is ever outstanding
+        self._pending_limit = None
+        try:
+            chunk: List[tuple] = []
+            for item in self.records(corpus_path):
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    self._run_chunk(chunk, process_chunk)
+                    chunk = []
+            if chunk:
+                self._run_chunk(chunk, process_chunk)
+        finally:
+            self._close()
+        return self.state
+
+    def _run_chunk(self, chunk: List[tuple], process_chunk: Callable[[List[Dict]], List[Dict]]):
+        results = process_chunk([record for _, record in chunk])
+        for (start, _), result in zip(chunk, results):
+            self._complete(start, result, failed=bool(result.get("error")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tailor a resume for every job in a large corpus")
+    parser.add_argument("resume_file")
+    parser.add_argument("jobs_file", help="JSONL or CSV with id, job_description and job_url fields")
+    parser.add_argument("--mode", choices=["batch", "live"], default="batch",
+                        help="batch: Message Batches API waves; live: streaming workers")
+    parser.add_argument("--poll", type=float, default=60.0, help="Seconds between batch status polls")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Jobs per message batch")
+    parser.add_argument("--workers", type=int, default=4, help="Worker threads in live mode")
+    parser.add_argument("--queue-size", type=int, default=64, help="Bounded queue size in live mode")
+    parser.add_argument("--results", default="batch_results.jsonl", help="Results JSONL (appended)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <jobs_file>.checkpoint.json)")
+    args = parser.parse_args()
+
+    try:
+        agent = LangChainResumeAgentUI(priority="batch")
+        ingestor = StreamingIngestor(
+            args.results, args.checkpoint or args.jobs_file + ".checkpoint.json",
+            workers=args.workers, queue_size=args.queue_size
+        )
+
+        if args.mode == "live":
+            state = ingestor.run(args.jobs_file, lambda record: agent.run_job(
+                record["job_description"], args.resume_file, record["job_url"]))
+        else:
+            runner = BatchTailoringRunner(agent, AnthropicBatchClient(agent.api_key),
+                                          poll_interval=args.poll)
+            state = ingestor.run_chunks(args.jobs_file, lambda records: runner.run(
+                records, args.resume_file), chunk_size=args.chunk_size)
+
+        agent.display_usage()
+        console.print(
+            f"[green]✓ Batch complete.[/green] {state['processed']} processed, {state['failed']} failed, "
+            f"{state['duplicates']} duplicates, {state['invalid']} invalid. "
+            f"Results: [cyan]{args.results}[/cyan]"
+        )
+    except Exception as e:
+        console.print(f"\n[red]Error:[/red] {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
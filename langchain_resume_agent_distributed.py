@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+LangChain Resume Agent distributed batch mode
+Shards job records across worker processes (or nodes) by consistent hash, with work stealing
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import socket
+import hashlib
+import sqlite3
+import argparse
+import importlib
+import threading
+import multiprocessing
+from typing import Callable, Dict, Iterable, List, Optional
+
+from rich.table import Table
+from rich import box
+
+from langchain_resume_agent_ui import LangChainResumeAgentUI, SharedJobStore, console
+from langchain_resume_agent_batch import CorpusReader, StreamingIngestor
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes
+
+    A task always maps to the same shard, so re-enqueueing a corpus keeps every job on
+    the shard it was on. Adding or removing a shard only moves the jobs on its arcs of
+    the ring (about 1/N of them). Workers keep no per-job cache: keywords are shared
+    through the SharedJobStore, keyed by job content, whichever worker runs the job.
+    """
+
+    def __init__(self, shards: Iterable[str], vnodes: int = 64):
+        self.vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        for shard in shards:
+            self.add(shard)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int(hashlib.md5(value.encode()).hexdigest()[:16], 16)
+
+    def add(self, shard: str):
+        for i in range(self.vnodes):
+            point = self._hash(f"{shard}#{i}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, shard)
+
+    def remove(self, shard: str):
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != shard]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    @property
+    def shards(self) -> List[str]:
+        return sorted(set(self._owners))
+
+    def shard_for(self, key: str) -> str:
+        """The shard owning key (first virtual node clockwise from its hash)"""
+        if not self._points:
+            raise ValueError("Hash ring has no shards")
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class ShardQueue:
+    """SQLite task queue shared by the coordinator and every worker process or node
+
+    Tasks are keyed by corpus, job ID and job text, so re-enqueueing a corpus is a no-op
+    while generated IDs (offset-<N>) from different corpora, or IDs a scraped dump reuses
+    for different postings, never collide. Each task belongs to the shard its key hashes
+    to. A worker claims from its own shard first; once that is empty it steals from the
+    tail of the shard with the most queued work. Claims are leases, so tasks held by a
+    crashed worker become claimable again once the lease runs out. Keep the file on a filesystem with working POSIX
+    locks (local disk, or a shared volume that supports them) when workers span nodes.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 900.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                corpus TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                shard TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                status TEXT NOT NULL,
+                owner TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                updated_at REAL
+            )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_shard ON tasks (shard, status, position)")
+            conn.execute("""CREATE TABLE IF NOT EXISTS workers (
+                name TEXT NOT NULL,
+                host TEXT NOT NULL,
+                pid INTEGER NOT NULL,
+                stats TEXT,
+                updated_at REAL,
+                PRIMARY KEY (name, host, pid)
+            )""")
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers proceed while a writer commits"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def task_id(corpus: str, record: Dict) -> str:
+        """Queue key for a record: the same job from the same corpus always gets the same key"""
+        return hashlib.md5(json.dumps(
+            [corpus, record["id"], SharedJobStore.content_key(record["job_description"])]
+        ).encode()).hexdigest()
+
+    def enqueue(self, records: Iterable[Dict], ring: HashRing, corpus: str) -> Dict[str, int]:
+        """Add a corpus's records as tasks on their shards; tasks already queued are skipped"""
+        conn = self._connect()
+        counts = {"queued": 0, "duplicates": 0}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            position = conn.execute("SELECT COALESCE(MAX(position), -1) FROM tasks").fetchone()[0]
+            for record in records:
+                position += 1
+                task_id = self.task_id(corpus, record)
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO tasks (task_id, corpus, job_id, shard, position, record, "
+                    "status, updated_at) VALUES (?, ?, ?, ?, ?, ?, 'queued', ?)",
+                    (task_id, corpus, record["id"], ring.shard_for(task_id), position,
+                     json.dumps(record), time.time())
+                )
+                counts["queued" if cursor.rowcount == 1 else "duplicates"] += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return counts
+
+    def claim(self, worker: str, shard: str, steal: bool = True) -> Optional[Dict]:
+        """Lease the next task for a worker: own shard first, then steal; None if nothing is claimable"""
+        conn = self._connect()
+        now = time.time()
+        claimable = "(status = 'queued' OR (status = 'running' AND lease_until < ?))"
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT task_id, record, shard FROM tasks WHERE shard = ? AND {claimable} "
+                "ORDER BY position LIMIT 1", (shard, now)
+            ).fetchone()
+            if row is None and steal:
+                # Take from the back of the busiest shard so its owner keeps working the front
+                victim = conn.execute(
+                    f"SELECT shard FROM tasks WHERE shard != ? AND {claimable} "
+                    "GROUP BY shard ORDER BY COUNT(*) DESC, shard LIMIT 1", (shard, now)
+                ).fetchone()
+                if victim:
+                    row = conn.execute(
+                        f"SELECT task_id, record, shard FROM tasks WHERE shard = ? AND {claimable} "
+                        "ORDER BY position DESC LIMIT 1", (victim[0], now)
+                    ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE tasks SET status = 'running', owner = ?, lease_until = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE task_id = ?",
+                (worker, now + self.lease_seconds, now, row[0])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return {"task_id": row[0], "record": json.loads(row[1]), "shard": row[2], "stolen": row[2] != shard}
+
+    def renew(self, task_id: str, worker: str) -> bool:
+        """Extend a held lease; False if the task is no longer this worker's"""
+        cursor = self._connect().execute(
+            "UPDATE tasks SET lease_until = ?, updated_at = ? "
+            "WHERE task_id = ? AND owner = ? AND status = 'running'",
+            (time.time() + self.lease_seconds, time.time(), task_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker: str, result: Dict) -> bool:
+        """Store a finished task's result; False (nothing stored) if the lease was lost"""
+        cursor = self._connect().execute(
+            "UPDATE tasks SET status = 'done', result = ?, lease_until = NULL, updated_at = ? "
+            "WHERE task_id = ? AND owner = ? AND status = 'running'",
+            (json.dumps(result), time.time(), task_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, task_id: str, worker: str, error: str) -> bool:
+        """Requeue a failed task, or mark it failed once it has used up its attempts;
+        False if the lease was lost"""
+        cursor = self._connect().execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "result = ?, lease_until = NULL, updated_at = ? "
+            "WHERE task_id = ? AND owner = ? AND status = 'running'",
+            (self.max_attempts, json.dumps({"error": error}), time.time(), task_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def requeue_running(self, owners: Iterable[str]) -> int:
+        """Release tasks still leased by workers known to be gone"""
+        owners = list(owners)
+        if not owners:
+            return 0
+        cursor = self._connect().execute(
+            f"UPDATE tasks SET status = 'queued', lease_until = NULL, updated_at = ? "
+            f"WHERE status = 'running' AND owner IN ({', '.join('?' * len(owners))})",
+            (time.time(), *owners)
+        )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._connect().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {"queued": 0, "running": 0, "done": 0, "failed": 0, **dict(rows)}
+
+    def record_worker(self, name: str, stats: Dict):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO workers (name, host, pid, stats, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (name, socket.gethostname(), os.getpid(), json.dumps(stats), time.time())
+        )
+
+    def results(self) -> List[Dict]:
+        """Every finished or failed task, in corpus order"""
+        rows = self._connect().execute(
+            "SELECT job_id, corpus, shard, owner, status, attempts, result FROM tasks "
+            "WHERE status IN ('done', 'failed') ORDER BY position"
+        ).fetchall()
+        return [
+            {"id": job_id, "corpus": corpus, "shard": shard, "worker": owner, "status": status,
+             "attempts": attempts, **json.loads(result or "{}")}
+            for job_id, corpus, shard, owner, status, attempts, result in rows
+        ]
+
+    def workers(self) -> List[Dict]:
+        """Stats recorded by each worker process, one entry per process run"""
+        rows = self._connect().execute(
+            "SELECT name, host, pid, stats FROM workers ORDER BY name, updated_at"
+        ).fetchall()
+        return [{"name": name, "host": host, "pid": pid, **json.loads(stats)}
+                for name, host, pid, stats in rows]
+
+
+def batch_agent() -> LangChainResumeAgentUI:
+    """Default agent factory for worker processes"""
+    return LangChainResumeAgentUI(priority="batch")
+
+
+def load_factory(path: str) -> Callable[[], LangChainResumeAgentUI]:
+    """Resolve a 'module:function' agent factory, so spawned workers can import it"""
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+class LeaseRenewer(threading.Thread):
+    """Keeps a task's lease alive while a long job runs, so no other worker re-runs it"""
+
+    def __init__(self, shard_queue: ShardQueue, task_id: str, worker: str):
+        super().__init__(daemon=True)
+        self.shard_queue = shard_queue
+        self.task_id = task_id
+        self.worker = worker
+        self._stop_event = threading.Event()
+
+    def run(self):
+        interval = self.shard_queue.lease_seconds / 3
+        while not self._stop_event.wait(interval):
+            if not self.shard_queue.renew(self.task_id, self.worker):
+                return
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_worker(queue_path: str, worker: str, shard: str, resume_path: str,
+               agent_factory: str = "langchain_resume_agent_distributed:batch_agent",
+               steal: bool = True) -> Dict:
+    """Worker loop: claim, run the 4-agent workflow, record the result, until nothing is left"""
+    shard_queue = ShardQueue(queue_path)
+    agent = load_factory(agent_factory)()
+    stats = {"shard": shard, "processed": 0, "failed": 0, "stolen": 0, "lost_leases": 0,
+             "busy_seconds": 0.0}
+
+    while True:
+        task = shard_queue.claim(worker, shard, steal)
+        if task is None:
+            break
+        record = task["record"]
+        started = time.perf_counter()
+        renewer = LeaseRenewer(shard_queue, task["task_id"], worker)
+        renewer.start()
+        try:
+            result = agent.run_job(record["job_description"], resume_path, record["job_url"])
+            renewer.stop()
+            outcome, recorded = "processed", shard_queue.complete(task["task_id"], worker, result)
+        except Exception as e:
+            renewer.stop()
+            error = str(e).splitlines()[0] if str(e) else type(e).__name__
+            outcome, recorded = "failed", shard_queue.fail(task["task_id"], worker, error)
+        stats["busy_seconds"] += time.perf_counter() - started
+
+        # Only count work whose result actually landed in the queue
+        if recorded:
+            stats[outcome] += 1
+            stats["stolen"] += task["stolen"]
+        else:
+            stats["lost_leases"] += 1
+
+    stats["busy_seconds"] = round(stats["busy_seconds"], 2)
+    stats["agent_usage"] = agent.usage.report()
+    shard_queue.record_worker(worker, stats)
+    return stats
+
+
+class DistributedBatchCoordinator:
+    """Shards a job corpus over a ShardQueue and runs local worker processes against it
+
+    Other nodes can join by running `work` against the same queue file with their own
+    shard names; the merged report covers every worker that recorded results.
+    """
+
+    def __init__(self, queue_path: str, shards: List[str], vnodes: int = 64,
+                 agent_factory: str = "langchain_resume_agent_distributed:batch_agent",
+                 max_rounds: int = 3):
+        self.queue = ShardQueue(queue_path)
+        self.ring = HashRing(shards, vnodes)
+        self.agent_factory = agent_factory
+        self.max_rounds = max_rounds
+
+    def enqueue(self, corpus_path: str) -> Dict[str, int]:
+        """Read, normalize and shard every record in a JSONL or CSV corpus"""
+        invalid = [0]
+
+        def records():
+            for start, _, raw in CorpusReader(corpus_path).records():
+                record = StreamingIngestor.normalize_record(raw, start)
+                if record is None:
+                    invalid[0] += 1
+                    continue
+                yield record
+
+        counts = self.queue.enqueue(records(), self.ring, os.path.abspath(corpus_path))
+        counts["invalid"] = invalid[0]
+        return counts
+
+    def run_local(self, resume_path: str, workers: Optional[List[str]] = None,
+                  steal: bool = True) -> Dict[str, int]:
+        """Run one worker process per shard on this box until the queue is drained
+
+        Workers use the spawn start method, so each gets its own SQLite connections and
+        caches. Tasks left leased by a worker that died are requeued for another round.
+        """
+        workers = workers or self.ring.shards
+        context = multiprocessing.get_context("spawn")
+        for _ in range(self.max_rounds):
+            processes = [
+                context.Process(target=run_worker, name=shard, args=(
+                    self.queue.path, f"{socket.gethostname()}/{shard}", shard, resume_path,
+                    self.agent_factory, steal))
+                for shard in workers
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+            released = self.queue.requeue_running(f"{socket.gethostname()}/{shard}" for shard in workers)
+            if not released and not self.queue.counts()["queued"]:
+                break
+        return self.queue.counts()
+
+    @staticmethod
+    def merge_workers(runs: List[Dict]) -> Dict[str, Dict]:
+        """Per-worker totals over every process run (a worker restarts once per round)"""
+        merged: Dict[str, Dict] = {}
+        for run in runs:
+            entry = merged.setdefault(run["name"], {
+                "host": run["host"], "shard": run["shard"], "runs": 0,
+                "processed": 0, "failed": 0, "stolen": 0, "lost_leases": 0, "busy_seconds": 0.0,
+            })
+            entry["runs"] += 1
+            for key in ("processed", "failed", "stolen", "lost_leases", "busy_seconds"):
+                entry[key] += run.get(key, 0)
+        for entry in merged.values():
+            entry["busy_seconds"] = round(entry["busy_seconds"], 2)
+        return merged
+
+    @staticmethod
+    def merge_usage(runs: List[Dict]) -> Dict[str, Dict]:
+        """Sum per-agent LLM usage over all workers"""
+        merged: Dict[str, Dict] = {}
+        for stats in runs:
+            for agent, usage in stats.get("agent_usage", {}).items():
+                entry = merged.setdefault(agent, {
+                    "models": [], "calls": 0, "escalations": 0, "llm_seconds": 0.0,
+                    "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0,
+                })
+                entry["models"] = sorted(set(entry["models"]) | set(usage["models"]))
+                for key in ("calls", "escalations", "llm_seconds", "input_tokens", "output_tokens", "cost_usd"):
+                    entry[key] += usage[key]
+        for entry in merged.values():
+            entry["llm_seconds"] = round(entry["llm_seconds"], 2)
+            entry["cost_usd"] = round(entry["cost_usd"], 5)
+        return merged
+
+    def report(self) -> Dict:
+        """One report merged from every worker's results and stats"""
+        results = self.queue.results()
+        runs = self.queue.workers()
+        done = [result for result in results if result["status"] == "done"]
+
+        def mean(key: str) -> Optional[float]:
+            values = [result[key] for result in done if isinstance(result.get(key), (int, float))]
+            return round(sum(values) / len(values), 1) if values else None
+
+        return {
+            "counts": self.queue.counts(),
+            "mean_match_percentage": mean("match_percentage"),
+            "mean_candidacy_score": mean("candidacy_score"),
+            "workers": self.merge_workers(runs),
+            "agent_usage": self.merge_usage(runs),
+            "jobs": results,
+        }
+
+
+def display_report(report: Dict):
+    """Print per-worker throughput and stealing, plus the overall outcome"""
+    table = Table(title="🧩 Distributed Batch Workers", box=box.ROUNDED)
+    table.add_column("Worker", style="cyan")
+    table.add_column("Shard", style="white")
+    table.add_column("Processed", justify="right", style="green")
+    table.add_column("Stolen", justify="right", style="yellow")
+    table.add_column("Failed", justify="right", style="red")
+    table.add_column("Busy", justify="right")
+
+    for name, stats in report["workers"].items():
+        table.add_row(name, stats["shard"], str(stats["processed"]), str(stats["stolen"]),
+                      str(stats["failed"]), f"{stats['busy_seconds']:.1f}s")
+
+    console.print(table)
+    counts = report["counts"]
+    console.print(
+        f"[green]✓ {counts['done']} done[/green], {counts['failed']} failed, "
+        f"{counts['queued'] + counts['running']} still pending. "
+        f"Mean match: {report['mean_match_percentage']}%, "
+        f"mean candidacy: {report['mean_candidacy_score']}/100"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shard a job corpus across worker processes or nodes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Enqueue a corpus, run local workers and write the merged report")
+    run.add_argument("resume_file")
+    run.add_argument("jobs_file", help="JSONL or CSV with id, job_description and job_url fields")
+    run.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Local worker processes")
+
+    enqueue = commands.add_parser("enqueue", help="Shard a corpus into the queue without running it")
+    enqueue.add_argument("jobs_file")
+    enqueue.add_argument("--shards", type=int, default=4, help="Number of shards (shard-0 .. shard-N-1)")
+
+    work = commands.add_parser("work", help="Run workers for the given shards, e.g. on another node")
+    work.add_argument("resume_file")
+    work.add_argument("shard", nargs="+", help="Shard names this node owns")
+
+    report = commands.add_parser("report", help="Write the merged report")
+
+    for command in (run, enqueue, work, report):
+        command.add_argument("--queue", default="distributed_queue.db", help="Shared SQLite queue file")
+        command.add_argument("--output", default="distributed_report.json", help="Merged report path")
+    for command in (run, work):
+        command.add_argument("--agent-factory", default="langchain_resume_agent_distributed:batch_agent",
+                             help="module:function returning a LangChainResumeAgentUI")
+        command.add_argument("--no-steal", action="store_true", help="Only work on owned shards")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        shards = [f"shard-{i}" for i in range(args.workers)]
+    elif args.command == "enqueue":
+        shards = [f"shard-{i}" for i in range(args.shards)]
+    elif args.command == "work":
+        shards = args.shard
+    else:
+        shards = []
+
+    try:
+        coordinator = DistributedBatchCoordinator(
+            args.queue, shards,
+            agent_factory=getattr(args, "agent_factory", "langchain_resume_agent_distributed:batch_agent")
+        )
+
+        if args.command in ("run", "enqueue"):
+            counts = coordinator.enqueue(args.jobs_file)
+            console.print(f"Queued {counts['queued']} jobs over {len(shards)} shards "
+                          f"({counts['duplicates']} already queued, {counts['invalid']} invalid)")
+        if args.command in ("run", "work"):
+            coordinator.run_local(args.resume_file, shards, steal=not args.no_steal)
+        if args.command in ("run", "work", "report"):
+            merged = coordinator.report()
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, indent=2)
+            display_report(merged)
+            console.print(f"Report: [cyan]{args.output}[/cyan]")
+    except Exception as e:
+        console.print(f"\n[red]Error:[/red] {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Per-stage profiling for --profile runs
+cProfile stats, sampled stacks for flamegraphs and tracemalloc snapshots for each pipeline stage
+"""
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+
+# Builtins that block on the network, locks or timers rather than doing local work
+WAIT_MARKERS = ("_ssl.", "_socket.", "select.", "'acquire'", "time.sleep", "getaddrinfo", "'poll'")
+
+
+class StageStats:
+    """Everything collected for one named stage, summed over repeated entries"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.entries = 0
+        self.wall_seconds = 0.0
+        self.llm_seconds = 0.0
+        self.peak_bytes = 0
+        self.stats: Optional[pstats.Stats] = None
+        self.stacks: Counter = Counter()
+        self.allocations: Counter = Counter()
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+
+
+class StageSampler(threading.Thread):
+    """Samples one thread's stack at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def frame_label(frame) -> str:
+        module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+        return f"{module}:{frame.f_code.co_name}"
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(self.frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+class StageProfiler:
+    """Wraps pipeline stages with cProfile, a stack sampler and tracemalloc
+
+    Each stage writes <stage>.pstats (snakeviz / pstats), <stage>.collapsed
+    (flamegraph.pl / speedscope) and <stage>.tracemalloc (tracemalloc.Snapshot.load)
+    to output_dir. Nested stages are timed as part of the outer stage only.
+    A disabled profiler is a no-op, so callers can wrap stages unconditionally.
+    """
+
+    def __init__(self, output_dir: str = "profile", enabled: bool = True,
+                 sample_interval: float = 0.005, llm_seconds: Optional[Callable[[], float]] = None,
+                 trace_frames: int = 10):
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.sample_interval = sample_interval
+        # Running total of seconds spent waiting on the LLM, so it can be taken out of stage time
+        self.llm_seconds = llm_seconds
+        self.trace_frames = trace_frames
+        self.stages: Dict[str, StageStats] = {}
+        self._active = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Profile the with-block as (part of) stage `name`"""
+        if not self.enabled or self._active:
+            yield
+            return
+
+        self._active = True
+        entry = self.stages.setdefault(name, StageStats(name))
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+        tracemalloc.reset_peak()
+        before = self._snapshot()
+
+        sampler = StageSampler(threading.get_ident(), self.sample_interval)
+        profile = cProfile.Profile()
+        llm_before = self.llm_seconds() if self.llm_seconds else 0.0
+        started = time.perf_counter()
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            entry.wall_seconds += time.perf_counter() - started
+            entry.llm_seconds += (self.llm_seconds() if self.llm_seconds else 0.0) - llm_before
+            entry.stacks.update(sampler.stop())
+
+            entry.peak_bytes = max(entry.peak_bytes, tracemalloc.get_traced_memory()[1])
+            after = self._snapshot()
+            for diff in after.compare_to(before, "lineno"):
+                if diff.size_diff:
+                    entry.allocations[str(diff.traceback[0])] += diff.size_diff
+            entry.snapshot = after
+
+            if entry.stats is None:
+                entry.stats = pstats.Stats(profile)
+            else:
+                entry.stats.add(profile)
+            entry.entries += 1
+            self._active = False
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        """Allocation snapshot without the profiler's own bookkeeping"""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+
+    @staticmethod
+    def is_wait(func: tuple) -> bool:
+        """True for builtins that block on I/O, locks or sleep"""
+        filename, _, name = func
+        return filename == "~" and any(marker in name for marker in WAIT_MARKERS)
+
+    @staticmethod
+    def location(func: tuple) -> str:
+        """Short 'package: function' label for a pstats function key"""
+        filename, line, name = func
+        if filename == "~":
+            return name.strip("<>")
+        parts = filename.replace("\\", "/").split("/")
+        if "site-packages" in parts:
+            package = parts[parts.index("site-packages") + 1]
+        else:
+            package = os.path.splitext(parts[-1])[0]
+        return f"{package}: {name} ({os.path.basename(filename)}:{line})"
+
+    def hottest(self, top: int = 15) -> List[Dict]:
+        """Functions ranked by self time across stages, with LLM / network / lock waits left out"""
+        functions: Dict[tuple, Dict] = {}
+        for entry in self.stages.values():
+            if entry.stats is None:
+                continue
+            for func, (_, calls, self_time, cumulative, _) in entry.stats.stats.items():
+                if self.is_wait(func):
+                    continue
+                row = functions.setdefault(func, {
+                    "function": self.location(func), "calls": 0, "self_seconds": 0.0,
+                    "cumulative_seconds": 0.0, "stage": entry.name, "_stage_seconds": 0.0,
+                })
+                row["calls"] += calls
+                row["self_seconds"] += self_time
+                row["cumulative_seconds"] += cumulative
+                if self_time > row["_stage_seconds"]:
+                    row["stage"], row["_stage_seconds"] = entry.name, self_time
+
+        ranked = sorted(functions.values(), key=lambda row: row["self_seconds"], reverse=True)[:top]
+        for row in ranked:
+            del row["_stage_seconds"]
+        return ranked
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-stage wall time, LLM wait, local time and allocation figures"""
+        summary = {}
+        for name, entry in self.stages.items():
+            local_cpu = 0.0
+            if entry.stats is not None:
+                local_cpu = sum(self_time for func, (_, _, self_time, _, _) in entry.stats.stats.items()
+                                if not self.is_wait(func))
+            summary[name] = {
+                "entries": entry.entries,
+                "wall_seconds": round(entry.wall_seconds, 3),
+                "llm_seconds": round(entry.llm_seconds, 3),
+                "local_seconds": round(max(0.0, entry.wall_seconds - entry.llm_seconds), 3),
+                "local_cpu_seconds": round(local_cpu, 3),
+                "peak_kib": round(entry.peak_bytes / 1024, 1),
+                "net_alloc_kib": round(sum(entry.allocations.values()) / 1024, 1),
+                "top_allocations": [
+                    {"line": line, "kib": round(size / 1024, 1)}
+                    for line, size in entry.allocations.most_common(5)
+                ],
+            }
+        return summary
+
+    def write(self) -> List[str]:
+        """Write per-stage pstats, collapsed stacks and tracemalloc snapshots; return the paths"""
+        if not self.stages:
+            return []
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        paths = []
+        for name, entry in self.stages.items():
+            base = os.path.join(self.output_dir, name)
+            if entry.stats is not None:
+                entry.stats.dump_stats(f"{base}.pstats")
+                paths.append(f"{base}.pstats")
+            with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+                for stack, count in entry.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.append(f"{base}.collapsed")
+            if entry.snapshot is not None:
+                entry.snapshot.dump(f"{base}.tracemalloc")
+                paths.append(f"{base}.tracemalloc")
+        return paths
+
+    def close(self):
+        """Stop tracemalloc once the run is done"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+LLM call scheduler shared by interactive and batch runs
+Priority classes, weighted fair queuing per user, deadlines and queue metrics
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from langchain_core.runnables import Runnable
+
+
+class BatchCallPreempted(Exception):
+    """Raised in a queued batch call that was evicted to make room for interactive work"""
+
+
+class ScheduledCall:
+    """One queued LLM call"""
+
+    def __init__(self, seq: int, priority: str, user: str, submitted: float,
+                 deadline: Optional[float], start_tag: float, finish_tag: float):
+        self.seq = seq
+        self.priority = priority
+        self.user = user
+        self.submitted = submitted
+        self.deadline = deadline
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.dispatched: Optional[float] = None
+        self.preempted = False
+
+
+class LLMScheduler:
+    """Decides which queued LLM call gets the next free concurrency slot
+
+    - interactive calls always go before batch calls
+    - within a class, users share slots by weighted fair queuing
+    - a call whose deadline is within urgency_window jumps both queues (earliest deadline first)
+    - in-flight calls are never interrupted; under interactive pressure the newest queued
+      batch call is evicted (BatchCallPreempted) and ScheduledLLM resubmits it after a backoff
+
+    The core (submit / dispatch / release) never blocks and takes an injectable clock,
+    so it can be driven by a simulated clock; slot() wraps it for real threads.
+    """
+
+    PRIORITIES = ("interactive", "batch")
+
+    def __init__(self, max_concurrency: int = 4, clock: Callable[[], float] = time.monotonic,
+                 user_weights: Optional[Dict[str, float]] = None, urgency_window: float = 5.0,
+                 evict_batch_above: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self.clock = clock
+        self.user_weights = user_weights or {}
+        self.urgency_window = urgency_window
+        # Each interactive call queued while more than this many are waiting evicts one batch call
+        self.evict_batch_above = evict_batch_above
+
+        self.queues: Dict[str, List[ScheduledCall]] = {p: [] for p in self.PRIORITIES}
+        self.in_flight = 0
+        self._seq = 0
+        self._virtual_time = {p: 0.0 for p in self.PRIORITIES}
+        self._last_finish: Dict[tuple, float] = {}
+        self._waits: Dict[str, List[float]] = {p: [] for p in self.PRIORITIES}
+        self._counters = {"dispatched": 0, "preemptions": 0, "evictions": 0, "deadline_misses": 0}
+        self._cond = threading.Condition()
+
+    def submit(self, priority: str = "interactive", user: str = "default",
+               deadline_seconds: Optional[float] = None, cost: float = 1.0) -> ScheduledCall:
+        """Queue a call and return its ticket"""
+        if priority not in self.queues:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        with self._cond:
+            now = self.clock()
+            weight = self.user_weights.get(user, 1.0)
+            start = max(self._virtual_time[priority], self._last_finish.get((priority, user), 0.0))
+            finish = start + cost / weight
+            self._last_finish[(priority, user)] = finish
+
+            self._seq += 1
+            call = ScheduledCall(self._seq, priority, user, now,
+                                 now + deadline_seconds if deadline_seconds is not None else None,
+                                 start, finish)
+            self.queues[priority].append(call)
+
+            if priority == "interactive":
+                self._evict_batch()
+            self._cond.notify_all()
+            return call
+
+    def _evict_batch(self):
+        """Drop the newest queued batch call when an interactive arrival goes over the threshold"""
+        if self.evict_batch_above is None:
+            return
+        batch = self.queues["batch"]
+        if batch and len(self.queues["interactive"]) > self.evict_batch_above:
+            call = batch.pop()
+            call.preempted = True
+            # The call never ran, so take back its share; otherwise the resubmit is charged twice
+            key = (call.priority, call.user)
+            if self._last_finish.get(key) == call.finish_tag:
+                self._last_finish[key] = call.start_tag
+            self._counters["evictions"] += 1
+
+    def _next(self, now: float) -> Optional[ScheduledCall]:
+        """Pick the call that should run next"""
+        queued = [call for queue in self.queues.values() for call in queue]
+        if not queued:
+            return None
+
+        urgent = [call for call in queued
+                  if call.deadline is not None and call.deadline - now <= self.urgency_window]
+        if urgent:
+            return min(urgent, key=lambda call: (call.deadline, call.seq))
+
+        for priority in self.PRIORITIES:
+            if self.queues[priority]:
+                return min(self.queues[priority], key=lambda call: (call.finish_tag, call.seq))
+        return None
+
+    def dispatch(self) -> Optional[ScheduledCall]:
+        """Give a free slot to the next call, if there is a free slot and a queued call"""
+        with self._cond:
+            if self.in_flight >= self.max_concurrency:
+                return None
+
+            now = self.clock()
+            call = self._next(now)
+            if call is None:
+                return None
+
+            self.queues[call.priority].remove(call)
+            if call.priority == "interactive" and any(
+                    waiting.seq < call.seq for waiting in self.queues["batch"]):
+                # An older batch call was queued and got overtaken
+                self._counters["preemptions"] += 1
+
+            call.dispatched = now
+            self._virtual_time[call.priority] = max(self._virtual_time[call.priority], call.start_tag)
+            self._waits[call.priority].append(now - call.submitted)
+            self._counters["dispatched"] += 1
+            if call.deadline is not None and now > call.deadline:
+                self._counters["deadline_misses"] += 1
+            self.in_flight += 1
+            self._cond.notify_all()
+            return call
+
+    def release(self, call: ScheduledCall):
+        """Mark a dispatched call as finished, freeing its slot"""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def acquire(self, priority: str = "interactive", user: str = "default",
+                deadline_seconds: Optional[float] = None, cost: float = 1.0) -> ScheduledCall:
+        """Block until a new call is dispatched; the caller must release() it"""
+        call = self.submit(priority, user, deadline_seconds, cost)
+        with self._cond:
+            while call.dispatched is None:
+                if call.preempted:
+                    raise BatchCallPreempted(f"Batch call for {user} preempted by interactive load")
+                # Whoever sees a free slot dispatches the best call, not necessarily its own
+                if self.dispatch() is None or call.dispatched is None:
+                    self._cond.wait(timeout=0.5)
+        return call
+
+    @contextmanager
+    def slot(self, priority: str = "interactive", user: str = "default",
+             deadline_seconds: Optional[float] = None, cost: float = 1.0):
+        """Block until this call is dispatched, then hold a slot for the with-block"""
+        call = self.acquire(priority, user, deadline_seconds, cost)
+        try:
+            yield call
+        finally:
+            self.release(call)
+
+    @staticmethod
+    def _summary(waits: List[float]) -> Dict:
+        if not waits:
+            return {"count": 0, "mean": 0.0, "p95": 0.0, "max": 0.0}
+        ordered = sorted(waits)
+        return {
+            "count": len(ordered),
+            "mean": round(sum(ordered) / len(ordered), 3),
+            "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+            "max": round(ordered[-1], 3),
+        }
+
+    def metrics(self) -> Dict:
+        """Queue depth, in-flight count, wait-time distribution and preemption counters"""
+        with self._cond:
+            return {
+                "queue_depth": {p: len(queue) for p, queue in self.queues.items()},
+                "in_flight": self.in_flight,
+                "wait_seconds": {p: self._summary(waits) for p, waits in self._waits.items()},
+                **self._counters,
+            }
+
+
+class ScheduledLLM(Runnable):
+    """Chat model wrapper that routes every call through an LLMScheduler
+
+    A batch call evicted from the queue is resubmitted after an exponential backoff,
+    so preemption delays the job instead of failing it. deadline_seconds applies to every
+    call; a call can override it with config={"metadata": {"deadline_seconds": ...}}.
+    """
+
+    def __init__(self, llm, scheduler: LLMScheduler, priority: str = "interactive",
+                 user: str = "default", deadline_seconds: Optional[float] = None,
+                 backoff_seconds: float = 1.0, max_backoff_seconds: float = 30.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.llm = llm
+        self.scheduler = scheduler
+        self.priority = priority
+        self.user = user
+        self.deadline_seconds = deadline_seconds
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.sleep = sleep
+        self.preemptions = 0
+
+    def _deadline_seconds(self, config) -> Optional[float]:
+        metadata = (config or {}).get("metadata") or {}
+        return metadata.get("deadline_seconds", self.deadline_seconds)
+
+    def _acquire(self, deadline_seconds: Optional[float]) -> ScheduledCall:
+        """Wait for a slot, backing off and resubmitting whenever the call is evicted"""
+        deadline = (self.scheduler.clock() + deadline_seconds
+                    if deadline_seconds is not None else None)
+        delay = self.backoff_seconds
+        while True:
+            remaining = deadline - self.scheduler.clock() if deadline is not None else None
+            try:
+                return self.scheduler.acquire(self.priority, self.user, remaining)
+            except BatchCallPreempted:
+                self.preemptions += 1
+                self.sleep(delay)
+                delay = min(delay * 2, self.max_backoff_seconds)
+
+    def invoke(self, input, config=None, **kwargs):
+        call = self._acquire(self._deadline_seconds(config))
+        try:
+            return self.llm.invoke(input, config, **kwargs)
+        finally:
+            self.scheduler.release(call)
+
+    def stream(self, input, config=None, **kwargs) -> Iterator:
+        call = self._acquire(self._deadline_seconds(config))
+        try:
+            yield from self.llm.stream(input, config, **kwargs)
+        finally:
+            self.scheduler.release(call)
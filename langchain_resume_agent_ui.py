@@ -5,12 +5,20 @@ A multi-agent workflow with beautiful progress visualization
 """
 
 import os
+import io
 import json
+import math
 import re
 import time
+import difflib
 import hashlib
+import sqlite3
+import threading
+import uuid
 from datetime import datetime
-from typing import Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Union
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from dotenv import load_dotenv
 from PyPDF2 import PdfReader
 from reportlab.lib.pagesizes import letter
@@ -22,6 +30,9 @@ from reportlab.lib.enums import TA_LEFT, TA_CENTER
 from langchain_anthropic import ChatAnthropic
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import Runnable
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeElapsedColumn
@@ -32,6 +43,9 @@ from rich.live import Live
 from rich.text import Text
 from rich import box
 
+from langchain_resume_agent_scheduler import LLMScheduler, ScheduledLLM
+from langchain_resume_agent_profiler import StageProfiler
+
 # Load environment variables
 load_dotenv()
 
@@ -129,6 +143,35 @@ Analyze the match.""")
 
         self.chain = self.prompt | self.llm | self.parser
 
+        # Re-scores only the categories touched by a resume edit
+        self.rescore_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert resume analyzer specializing in ATS matching.
+
+The candidate edited their resume. Re-score ONLY the listed categories (0-100) for how
+well the updated resume matches the job description.
+
+Return ONLY a JSON object:
+{{
+    "category_scores": {{
+        "category_name": 85
+    }}
+}}"""),
+            ("user", """Categories to re-score: {categories}
+
+Job Description:
+{job_description}
+
+Updated Resume:
+{resume}
+
+Keywords from Job:
+{keywords}
+
+Re-score the listed categories.""")
+        ])
+
+        self.rescore_chain = self.rescore_prompt | self.llm | self.parser
+
     def calculate_match(self, job_description: str, resume: str, keywords: Dict) -> Dict:
         """Calculate match percentage between resume and job"""
         result = self.chain.invoke({
@@ -138,6 +181,277 @@ Analyze the match.""")
         })
         return result
 
+    def rescore_categories(self, job_description: str, resume: str, keywords: Dict,
+                           match_analysis: Dict, categories: List[str]) -> Dict:
+        """Re-score the given categories and fold the change into the overall score"""
+        result = self.rescore_chain.invoke({
+            "categories": ", ".join(categories),
+            "job_description": job_description,
+            "resume": resume,
+            "keywords": json.dumps(keywords, indent=2)
+        })
+
+        old_scores = match_analysis['category_scores']
+        new_scores = dict(old_scores)
+        for category, score in result.get('category_scores', {}).items():
+            if category in categories:
+                new_scores[category] = score
+
+        # Shift the overall score by the average category change
+        delta = sum(new_scores[c] - old_scores.get(c, new_scores[c]) for c in new_scores) / len(new_scores)
+        overall = round(match_analysis['overall_match_percentage'] + delta)
+        return {**match_analysis,
+                'overall_match_percentage': max(0, min(100, overall)),
+                'category_scores': new_scores}
+
+
+class ResumeSectionParser:
+    """Utility class for splitting resumes into section-indexed blocks"""
+
+    # Canonical section keys, in the order the tailored resume lays them out
+    SECTION_ORDER = ["summary", "experience", "education", "skills",
+                     "projects", "certifications", "publications"]
+    # Complete heading names, optionally after HEADING_PREFIXES; a heading must be one of these
+    SECTION_ALIASES = [
+        ("summary", ("summary", "profile", "objective", "about me", "about",
+                     "summary of qualifications")),
+        ("experience", ("experience", "employment", "employment history", "work history",
+                        "career history")),
+        ("education", ("education", "education and training", "academic background")),
+        ("skills", ("skills", "skill", "skills and technologies", "technologies",
+                    "tools and technologies", "competencies", "skills and competencies")),
+        ("projects", ("projects", "project")),
+        ("certifications", ("certifications", "certification", "certificates", "licenses",
+                            "licences", "licenses and certifications",
+                            "certifications and licenses")),
+        ("publications", ("publications", "publication")),
+    ]
+    HEADING_PREFIXES = ("professional", "work", "relevant", "technical", "core", "key",
+                        "selected", "personal", "career", "academic", "executive",
+                        "additional", "other", "recent")
+    SECTION_TITLES = {
+        "summary": "Professional Summary",
+        "experience": "Experience",
+        "education": "Education",
+        "skills": "Technical Skills",
+        "projects": "Projects",
+        "certifications": "Certifications",
+        "publications": "Publications",
+    }
+    # Sections that depend on the job; every other one (header, education, certifications,
+    # publications, awards, ...) is job-independent and carried over unchanged
+    TAILORED_SECTIONS = ("summary", "experience", "skills", "projects")
+
+    @classmethod
+    def section_key(cls, title: str) -> Optional[str]:
+        """Map a heading to its canonical section key, or None if it isn't a known heading
+
+        The whole title has to name a section ("Work Experience", "Technical Skills"), so
+        job titles such as "Senior Project Manager" or "Education Coordinator" don't match.
+        """
+        words = re.sub(r'[^a-z ]+', ' ', title.lower().replace('&', ' and ')).split()
+        while words:
+            title = ' '.join(words)
+            for key, aliases in cls.SECTION_ALIASES:
+                if title in aliases:
+                    return key
+            if words[0] not in cls.HEADING_PREFIXES:
+                return None
+            words = words[1:]
+        return None
+
+    @classmethod
+    def _heading(cls, line: str) -> Optional[str]:
+        """Return the section key if the line is a section heading"""
+        if line.startswith('## '):
+            title = line[3:].strip()
+            return cls.section_key(title) or re.sub(r'[^a-z0-9]+', '_', title.lower()).strip('_')
+        if line.startswith('#'):
+            return None
+
+        # Plain text extracted from PDFs: short, unpunctuated lines naming a section
+        if len(line) > 40 or len(line.split()) > 3 or line[0] in '-•*':
+            return None
+        if not (line.isupper() or line.istitle() or line.endswith(':')):
+            return None
+        return cls.section_key(line)
+
+    @classmethod
+    def parse(cls, text: str) -> Dict[str, str]:
+        """Split resume text (markdown or plain text) into {section key: block}"""
+        sections: Dict[str, List[str]] = {"header": []}
+        current = "header"
+
+        for line in text.split('\n'):
+            stripped = line.strip()
+            key = cls._heading(stripped) if stripped else None
+            if key:
+                current = key
+                sections.setdefault(current, [])
+            sections[current].append(line)
+
+        return {key: '\n'.join(lines).strip() for key, lines in sections.items()
+                if '\n'.join(lines).strip()}
+
+    @classmethod
+    def assemble(cls, sections: Dict[str, str]) -> str:
+        """Join section blocks back into one resume in canonical order"""
+        order = ["header"] + cls.SECTION_ORDER
+        keys = [key for key in order if key in sections]
+        keys += [key for key in sections if key not in order]
+        return '\n\n'.join(sections[key] for key in keys if sections[key])
+
+    @classmethod
+    def is_stable(cls, key: str) -> bool:
+        """True for sections that don't depend on the target job"""
+        return key not in cls.TAILORED_SECTIONS
+
+    @classmethod
+    def stable_sections(cls, text: str) -> Dict[str, str]:
+        """Extract the job-independent sections from a tailored resume"""
+        return {key: value for key, value in cls.parse(text).items() if cls.is_stable(key)}
+
+    @classmethod
+    def stable_source(cls, text: str) -> str:
+        """Keep only the source sections the job-independent rewrite needs"""
+        sections = cls.parse(text)
+        return cls.assemble({key: value for key, value in sections.items() if cls.is_stable(key)})
+
+    @classmethod
+    def tailored_source(cls, text: str) -> str:
+        """Keep only the source sections the tailoring agent needs to rewrite"""
+        sections = cls.parse(text)
+        source = {key: value for key, value in sections.items()
+                  if key in cls.TAILORED_SECTIONS}
+        if "experience" not in source:
+            # Couldn't index the resume reliably; let the agent see all of it
+            return text
+        return cls.assemble(source)
+
+
+class BulletIndex:
+    """Local BM25 index over resume bullets, used to preselect the most relevant ones per role"""
+
+    BULLET_PREFIXES = ('- ', '• ', '● ', '▪ ', '◦ ', '* ', '– ')
+    INDEXED_SECTIONS = ("experience", "projects")
+
+    def __init__(self, resume_text: str, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.sections = ResumeSectionParser.parse(resume_text)
+        self.section_lines: Dict[str, List[str]] = {}
+        # Each bullet: section, role number, first/last line index and its text
+        self.bullets: List[Dict] = []
+
+        for section in self.INDEXED_SECTIONS:
+            if section in self.sections:
+                self._index_section(section)
+
+        self.doc_terms = [self._term_counts(bullet["text"]) for bullet in self.bullets]
+        self.doc_lengths = [sum(terms.values()) for terms in self.doc_terms]
+        self.avg_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.bullets else 0.0
+
+        self.doc_freq: Dict[str, int] = {}
+        for terms in self.doc_terms:
+            for term in terms:
+                self.doc_freq[term] = self.doc_freq.get(term, 0) + 1
+
+    @classmethod
+    def is_bullet(cls, line: str) -> bool:
+        """Check whether a resume line is a bullet point"""
+        return line.strip().startswith(cls.BULLET_PREFIXES)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Lowercase word tokens, keeping tech spellings like c++, c# and node.js"""
+        return [token.rstrip('.') for token in re.findall(r'[a-z0-9][a-z0-9+#.]*', text.lower())]
+
+    def _term_counts(self, text: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for token in self.tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        return counts
+
+    def _index_section(self, section: str):
+        lines = self.sections[section].split('\n')
+        self.section_lines[section] = lines
+        role = 0
+        previous_bullet = False
+
+        for i, line in enumerate(lines[1:], start=1):
+            stripped = line.strip()
+            if self.is_bullet(stripped):
+                self.bullets.append({"section": section, "role": role,
+                                     "start": i, "end": i, "text": stripped})
+                previous_bullet = True
+            elif previous_bullet and stripped and stripped[0].islower():
+                # PDF extraction wraps long bullets onto continuation lines
+                self.bullets[-1]["end"] = i
+                self.bullets[-1]["text"] += " " + stripped
+            elif stripped:
+                if previous_bullet:
+                    role += 1
+                previous_bullet = False
+
+    def score(self, query: str) -> List[float]:
+        """BM25 score of every bullet against the query text"""
+        query_terms = set(self.tokenize(query))
+        num_docs = len(self.bullets)
+        scores = []
+
+        for terms, length in zip(self.doc_terms, self.doc_lengths):
+            score = 0.0
+            for term in query_terms:
+                tf = terms.get(term, 0)
+                if not tf:
+                    continue
+                df = self.doc_freq[term]
+                idf = math.log((num_docs - df + 0.5) / (df + 0.5) + 1)
+                norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+                score += idf * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+
+        return scores
+
+    def select(self, keywords: Dict, per_role: int) -> str:
+        """Return the resume keeping only the top-scoring bullets of each role"""
+        query = " ".join(
+            " ".join(values) if isinstance(values, list) else str(values)
+            for values in keywords.values()
+        )
+        scores = self.score(query)
+
+        by_role: Dict[tuple, List[int]] = {}
+        for i, bullet in enumerate(self.bullets):
+            by_role.setdefault((bullet["section"], bullet["role"]), []).append(i)
+
+        dropped = set()
+        for indices in by_role.values():
+            if len(indices) <= per_role:
+                continue
+            # Stable sort keeps the original order among equally relevant bullets
+            ranked = sorted(indices, key=lambda i: -scores[i])
+            dropped.update(ranked[per_role:])
+
+        return self.without(dropped)
+
+    def without(self, dropped) -> str:
+        """Return the resume with the given bullets (by index) removed"""
+        if not dropped:
+            return ResumeSectionParser.assemble(self.sections)
+
+        skip: Dict[str, set] = {}
+        for i in dropped:
+            bullet = self.bullets[i]
+            skip.setdefault(bullet["section"], set()).update(range(bullet["start"], bullet["end"] + 1))
+
+        sections = dict(self.sections)
+        for section, lines in skip.items():
+            sections[section] = '\n'.join(
+                line for i, line in enumerate(self.section_lines[section]) if i not in lines
+            )
+        return ResumeSectionParser.assemble(sections)
+
 
 class ResumeTailoringAgent:
     """Agent responsible for creating optimized resume"""
@@ -220,16 +534,202 @@ Generate the complete tailored resume.""")
 
         self.chain = self.prompt | self.llm | self.parser
 
+        # Regenerates only the job-dependent sections; stable ones are spliced back in
+        self.sections_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert resume writer and career consultant.
+
+Rewrite ONLY the requested resume sections for the target job. The candidate's name,
+contact details, education, certifications and any other sections are handled separately -
+do NOT output them.
+
+Use this format for each section:
+
+## Professional Summary
+[2-3 lines highlighting relevant experience and key strengths for this role]
+
+## Experience
+
+### [Job Title] - [Company Name]
+*[Start Date - End Date]*
+
+- [Achievement with quantifiable results relevant to target job]
+
+## Technical Skills
+**[Category]**: Skill1, Skill2, Skill3
+
+## Projects
+[If relevant to the job, list significant projects]
+
+IMPORTANT:
+- Output only the requested sections, in the order given, each starting with its ## heading
+- The full resume must fit in a STRICT MAXIMUM of 2 pages - aggressively prioritize and cut less relevant content
+- Limit to 3-4 bullet points per job, focus only on the most impactful achievements
+- Include only 1-2 most relevant projects, or omit the projects section if experience is strong
+- NEVER add asterisks (*) after dates or anywhere else - use clean formatting without special characters
+- Use keywords from the job naturally
+- Keep all information truthful - NEVER fabricate experience
+- Format for ATS compatibility"""),
+            ("user", """Rewrite these sections for this job: {sections}
+
+Job Description:
+{job_description}
+
+Current Resume Sections:
+{resume}
+
+Extracted Keywords:
+{keywords}
+
+Match Analysis:
+{match_analysis}
+
+Generate only the requested sections.""")
+        ])
+
+        self.sections_chain = self.sections_prompt | self.llm | self.parser
+
+        # Regenerates only the job-independent sections after a resume edit
+        self.stable_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert resume writer and career consultant.
+
+Rewrite ONLY the candidate's name and contact block, education, certifications and any
+other sections (publications, awards, languages, ...) other than the summary, experience,
+skills and projects. These sections are shared by every tailored version of the resume -
+do NOT output a summary, experience, skills or projects.
+
+Use this format:
+
+# [Full Name]
+[Email] | [Phone] | [LinkedIn] | [Location]
+
+## Education
+
+### [Degree] - [University Name]
+[Graduation Date]
+[Relevant coursework if applicable]
+
+## Certifications
+[If applicable]
+
+[Any other sections, each under its own ## heading]
+
+IMPORTANT:
+- Omit any section the resume doesn't have
+- NEVER add asterisks (*) after dates or anywhere else - use clean formatting without special characters
+- Keep all information truthful - NEVER fabricate qualifications
+- Format for ATS compatibility"""),
+            ("user", """Current Resume Sections:
+{resume}
+
+Generate only the name and contact block and the job-independent sections.""")
+        ])
+
+        self.stable_chain = self.stable_prompt | self.llm | self.parser
+
+        self.shorten_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert resume editor.
+
+The resume below renders longer than the STRICT MAXIMUM of 2 pages. Shorten it so it fits.
+
+IMPORTANT:
+- Keep the exact same markdown structure, headings and section order
+- Tighten wording and cut the least relevant bullets, projects and details first
+- Keep the candidate's name, contact details, education and certifications intact
+- Never add new content and keep all information truthful
+- Return ONLY the shortened resume"""),
+            ("user", """This resume is about {overflow_lines} lines over the 2-page limit.
+
+Resume:
+{resume}
+
+Return the shortened resume.""")
+        ])
+
+        self.shorten_chain = self.shorten_prompt | self.llm | self.parser
+
     def create_resume(self, job_description: str, resume: str,
-                     keywords: Dict, match_analysis: Dict) -> str:
-        """Create tailored resume"""
-        result = self.chain.invoke({
+                     keywords: Dict, match_analysis: Dict,
+                     stable_sections: Optional[Dict[str, str]] = None,
+                     on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """Create tailored resume, reusing cached stable sections when available
+
+        When on_chunk is given the output is streamed and on_chunk receives the text so far.
+        """
+        if stable_sections:
+            return self.create_sections(job_description, resume, keywords,
+                                        match_analysis, stable_sections, on_chunk=on_chunk)
+
+        inputs = self.resume_inputs(job_description, resume, keywords, match_analysis)
+        if on_chunk:
+            return self._stream(self.chain, inputs, on_chunk)
+        result = self.chain.invoke(inputs)
+        return result
+
+    @staticmethod
+    def _stream(chain, inputs: Dict, on_chunk: Callable[[str], None]) -> str:
+        """Stream a chain's text output, reporting the accumulated text after each chunk"""
+        text = ""
+        for chunk in chain.stream(inputs):
+            text += chunk
+            on_chunk(text)
+        return text
+
+    @staticmethod
+    def resume_inputs(job_description: str, resume: str, keywords: Dict,
+                      match_analysis: Dict) -> Dict:
+        """Prompt inputs for a full tailoring call"""
+        return {
             "job_description": job_description,
             "resume": resume,
             "keywords": json.dumps(keywords, indent=2),
             "match_analysis": json.dumps(match_analysis, indent=2)
+        }
+
+    def shorten_resume(self, resume: str, overflow_lines: int) -> str:
+        """Shorten a tailored resume that overflows the page limit"""
+        return self.shorten_chain.invoke({
+            "resume": resume,
+            "overflow_lines": overflow_lines
         })
-        return result
+
+    def create_sections(self, job_description: str, resume: str, keywords: Dict,
+                        match_analysis: Dict, stable_sections: Dict[str, str],
+                        sections: Optional[List[str]] = None,
+                        on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """Regenerate the job-dependent sections and splice in the stable ones"""
+        inputs = self.sections_inputs(job_description, resume, keywords, match_analysis, sections)
+        if on_chunk:
+            generated = self._stream(self.sections_chain, inputs, on_chunk)
+        else:
+            generated = self.sections_chain.invoke(inputs)
+        return self.splice_sections(generated, stable_sections)
+
+    def create_stable_sections(self, resume: str) -> Dict[str, str]:
+        """Regenerate the job-independent sections of a resume on their own"""
+        generated = self.stable_chain.invoke({"resume": ResumeSectionParser.stable_source(resume)})
+        return ResumeSectionParser.stable_sections(generated)
+
+    @staticmethod
+    def sections_inputs(job_description: str, resume: str, keywords: Dict,
+                        match_analysis: Dict, sections: Optional[List[str]] = None) -> Dict:
+        """Prompt inputs for a call that regenerates only the given sections"""
+        sections = sections or list(ResumeSectionParser.TAILORED_SECTIONS)
+        return {
+            "sections": ", ".join(ResumeSectionParser.SECTION_TITLES[key] for key in sections),
+            "job_description": job_description,
+            "resume": ResumeSectionParser.tailored_source(resume),
+            "keywords": json.dumps(keywords, indent=2),
+            "match_analysis": json.dumps(match_analysis, indent=2)
+        }
+
+    @staticmethod
+    def splice_sections(generated: str, kept_sections: Dict[str, str]) -> str:
+        """Merge freshly generated sections with ones carried over unchanged"""
+        # The model occasionally echoes the name line; kept sections always win
+        merged = ResumeSectionParser.parse(generated)
+        merged.pop("header", None)
+        merged.update(kept_sections)
+        return ResumeSectionParser.assemble(merged)
 
 
 class RecruiterEvaluationAgent:
@@ -298,16 +798,121 @@ Provide your honest recruiter evaluation.""")
         return result
 
 
+class SpeculativeRecruiterEvaluator:
+    """Starts Agent 4 on the draft resume as soon as its core sections have streamed in
+
+    Feed it the tailoring agent's partial output. Once Summary and Experience are complete,
+    and Education and Skills are either complete or cached from an earlier job, the
+    evaluation starts in the background; resolve() keeps that result unless the final
+    resume differs materially from the draft, in which case the evaluation is re-run.
+    finish() closes the last section at the end of the stream, so a draft ending in
+    Skills still starts before the page fitting and PDF rendering.
+    """
+
+    CORE_SECTIONS = ("summary", "experience")
+    # The recruiter weighs these too; a draft without them is never good enough
+    ADJACENT_SECTIONS = ("education", "skills")
+
+    def __init__(self, recruiter_agent, job_description: str, match_analysis: Dict,
+                 kept_sections: Optional[Dict[str, str]] = None,
+                 min_similarity: float = 0.9, max_unseen_ratio: float = 0.35):
+        self.recruiter_agent = recruiter_agent
+        self.job_description = job_description
+        self.match_analysis = match_analysis
+        self.kept_sections = kept_sections or {}
+        # Materiality thresholds: core text similarity, and share of the final text the draft never had
+        self.min_similarity = min_similarity
+        self.max_unseen_ratio = max_unseen_ratio
+        self.draft: Optional[str] = None
+        self.future: Optional[Future] = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    @property
+    def started(self) -> bool:
+        return self.future is not None
+
+    def _core(self, sections: Dict[str, str]) -> str:
+        return '\n\n'.join(sections[key] for key in self.CORE_SECTIONS if key in sections)
+
+    def feed(self, partial_resume: str, final: bool = False):
+        """Start the evaluation once the streamed resume has moved past the core sections"""
+        if self.started:
+            return
+
+        sections = ResumeSectionParser.parse(partial_resume)
+        # The last section may still be streaming until a later heading or the end of the stream
+        complete = list(sections) if final else list(sections)[:-1]
+        if "experience" not in complete:
+            return
+        if not final and any(key not in complete and key not in self.kept_sections
+                             for key in self.ADJACENT_SECTIONS):
+            # First job for this resume: wait for Education and Skills to stream in as well
+            return
+
+        draft_sections = {key: sections[key] for key in complete}
+        draft_sections.update(self.kept_sections)
+        self.draft = ResumeSectionParser.assemble(draft_sections)
+
+        self.future = self._executor.submit(
+            self.recruiter_agent.evaluate_candidacy,
+            self.job_description, self.draft, self.match_analysis
+        )
+
+    def finish(self, resume: str):
+        """The stream has ended: every section is complete, start if we haven't yet"""
+        self.feed(resume, final=True)
+
+    def divergence(self, final_resume: str) -> Dict:
+        """Compare the final resume with the draft the speculative evaluation saw"""
+        draft_sections = ResumeSectionParser.parse(self.draft)
+        final_sections = ResumeSectionParser.parse(final_resume)
+
+        similarity = difflib.SequenceMatcher(
+            None, self._core(draft_sections), self._core(final_sections)
+        ).ratio()
+        unseen = sum(len(text) for key, text in final_sections.items() if key not in draft_sections)
+        unseen_ratio = unseen / max(len(final_resume), 1)
+        missing = [key for key in self.ADJACENT_SECTIONS
+                   if key in final_sections and key not in draft_sections]
+
+        return {
+            "similarity": round(similarity, 3),
+            "unseen_ratio": round(unseen_ratio, 3),
+            "missing_sections": missing,
+            "diverged": (similarity < self.min_similarity or unseen_ratio > self.max_unseen_ratio
+                         or bool(missing)),
+        }
+
+    def resolve(self, final_resume: str) -> tuple:
+        """Return (evaluation, divergence report), re-running Agent 4 if the draft was off"""
+        try:
+            report = self.divergence(final_resume)
+            report["started"] = True
+            try:
+                evaluation = self.future.result()
+            except Exception:
+                report["diverged"] = True
+                report["error"] = True
+
+            if report["diverged"]:
+                evaluation = self.recruiter_agent.evaluate_candidacy(
+                    self.job_description, final_resume, self.match_analysis
+                )
+            return evaluation, report
+        finally:
+            self._executor.shutdown(wait=False)
+
+
 class ResumePDFGenerator:
     """Utility class for generating PDF from resume text"""
 
-    @staticmethod
-    def convert_to_pdf(resume_text: str, output_path: str):
-        """Convert resume text to professionally formatted PDF"""
-        doc = SimpleDocTemplate(output_path, pagesize=letter,
-                              rightMargin=0.5*inch, leftMargin=0.5*inch,
-                              topMargin=0.5*inch, bottomMargin=0.5*inch)
+    PAGE_SIZE = letter
+    MARGIN = 0.5*inch
+    FRAME_PADDING = 6  # SimpleDocTemplate's default frame padding on every side
 
+    @staticmethod
+    def build_story(resume_text: str) -> List:
+        """Convert resume text to a list of reportlab flowables"""
         story = []
         styles = getSampleStyleSheet()
         lines = resume_text.split('\n')
@@ -350,7 +955,116 @@ class ResumePDFGenerator:
                 content = re.sub(r'\*\*([^\*]+)\*\*', r'<b>\1</b>', line)
                 story.append(Paragraph(content, styles['Normal']))
 
-        doc.build(story)
+        return story
+
+    @staticmethod
+    def convert_to_pdf(resume_text: str, output_path: Optional[str] = None) -> Optional[bytes]:
+        """Convert resume text to professionally formatted PDF
+
+        Writes to output_path when given, otherwise renders in memory and returns the PDF bytes.
+        """
+        buffer = io.BytesIO() if output_path is None else None
+        margin = ResumePDFGenerator.MARGIN
+        doc = SimpleDocTemplate(output_path or buffer, pagesize=ResumePDFGenerator.PAGE_SIZE,
+                              rightMargin=margin, leftMargin=margin,
+                              topMargin=margin, bottomMargin=margin)
+        doc.build(ResumePDFGenerator.build_story(resume_text))
+        return buffer.getvalue() if buffer is not None else None
+
+    @staticmethod
+    def measure(resume_text: str, max_pages: int = 2) -> Dict:
+        """Lay the story out in memory and report page count and overflow, without writing a PDF"""
+        generator = ResumePDFGenerator
+        width, height = generator.PAGE_SIZE
+        avail_width = width - 2*generator.MARGIN - 2*generator.FRAME_PADDING
+        avail_height = height - 2*generator.MARGIN - 2*generator.FRAME_PADDING
+
+        pages = 1
+        used = 0.0
+        pending = generator.build_story(resume_text)
+
+        while pending:
+            flowable = pending.pop(0)
+            # Like a platypus Frame, spaceBefore is dropped at the top of a page
+            space_before = flowable.getSpaceBefore() if used else 0
+            _, h = flowable.wrap(avail_width, avail_height)
+
+            if used + space_before + h <= avail_height or not used:
+                used = min(used + space_before + h + flowable.getSpaceAfter(), avail_height)
+                if h > avail_height:
+                    parts = flowable.split(avail_width, avail_height)
+                    if len(parts) > 1:
+                        pending[0:0] = parts[1:]
+                        pages += 1
+                        used = 0.0
+                continue
+
+            parts = flowable.split(avail_width, avail_height - used - space_before)
+            if len(parts) > 1:
+                # First fragment fills this page, the rest starts the next one
+                pending[0:0] = parts[1:]
+            else:
+                pending.insert(0, flowable)
+            pages += 1
+            used = 0.0
+
+        overflow = max(0.0, (pages - max_pages - 1) * avail_height + used) if pages > max_pages else 0.0
+        return {
+            "pages": pages,
+            "fits": pages <= max_pages,
+            "overflow_points": round(overflow, 1),
+            # Normal body text has 12pt leading
+            "overflow_lines": math.ceil(overflow / 12),
+        }
+
+
+class ResumePageFitter:
+    """Trims a tailored resume locally until it fits the page limit"""
+
+    # Sections dropped outright once bullets can't be trimmed any further
+    OPTIONAL_SECTIONS = ("publications", "projects")
+
+    def __init__(self, max_pages: int = 2, min_bullets_per_role: int = 2):
+        self.max_pages = max_pages
+        self.min_bullets_per_role = min_bullets_per_role
+
+    def fits(self, resume_text: str) -> bool:
+        """Check whether the resume renders within the page limit"""
+        return ResumePDFGenerator.measure(resume_text, self.max_pages)["fits"]
+
+    def _drop_one_bullet(self, resume_text: str) -> Optional[str]:
+        """Remove the last bullet of the role with the most bullets, oldest role on ties"""
+        index = BulletIndex(resume_text)
+        by_role: Dict[tuple, List[int]] = {}
+        for i, bullet in enumerate(index.bullets):
+            by_role.setdefault((bullet["section"], bullet["role"]), []).append(i)
+
+        candidates = [(len(indices), role, indices) for role, indices in by_role.items()
+                      if len(indices) > self.min_bullets_per_role]
+        if not candidates:
+            return None
+        _, _, indices = max(candidates)
+        return index.without([indices[-1]])
+
+    def trim(self, resume_text: str) -> str:
+        """Drop least important content until the resume fits (or nothing more can go)"""
+        text = re.sub(r'\n{3,}', '\n\n', resume_text.strip())
+
+        while not self.fits(text):
+            trimmed = self._drop_one_bullet(text)
+            if trimmed is None:
+                break
+            text = trimmed
+
+        sections = ResumeSectionParser.parse(text)
+        for section in self.OPTIONAL_SECTIONS:
+            if self.fits(text):
+                break
+            if section in sections:
+                del sections[section]
+                text = ResumeSectionParser.assemble(sections)
+
+        return text
 
 
 class ResumeCache:
@@ -392,27 +1106,644 @@ class ResumeCache:
         cls._path_hash_map.clear()
 
 
+class TailoredSectionCache:
+    """Cache for tailored sections that don't change between jobs (header, education, ...)"""
+
+    _cache: Dict[str, Dict[str, str]] = {}  # Maps resume content hash to stable sections
+
+    @classmethod
+    def _get_content_hash(cls, resume_text: str) -> str:
+        """Generate hash based on the parsed resume content"""
+        return hashlib.md5(resume_text.encode()).hexdigest()
+
+    @classmethod
+    def get(cls, resume_text: str) -> Optional[Dict[str, str]]:
+        """Get cached stable sections for this resume, if any"""
+        return cls._cache.get(cls._get_content_hash(resume_text))
+
+    @classmethod
+    def set(cls, resume_text: str, tailored_resume: str) -> None:
+        """Cache the stable sections of a fully generated tailored resume"""
+        sections = ResumeSectionParser.stable_sections(tailored_resume)
+        # Only worth reusing if we could actually find the name/contact block and education
+        if "header" in sections and "education" in sections:
+            cls._cache[cls._get_content_hash(resume_text)] = sections
+
+    @classmethod
+    def clear(cls) -> None:
+        """Clear all cached sections"""
+        cls._cache.clear()
+
+
+class SharedJobStore:
+    """SQLite-backed store of job-level artifacts shared by every user and worker process
+
+    Artifacts (keywords, cleaned job text, fetched HTML) are keyed by normalized job
+    content. get_or_compute() is single-flight: when several threads or processes ask
+    for the same missing artifact, one computes it and the rest wait for its result.
+    URL-keyed artifacts (fetched HTML, cleaned job text) expire after url_ttl_seconds,
+    since the posting behind a URL can be edited; content-keyed ones never go stale.
+    """
+
+    URL_KINDS = ("html", "job_text")
+    # Query parameters that only track where a click came from; anything else may pick the job
+    TRACKING_PARAMS = ("ref", "referrer", "referer", "source", "src", "trk", "trackingid",
+                       "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_hsenc", "_hsmi")
+    TRACKING_PREFIXES = ("utm_",)
+
+    def __init__(self, path: str, lease_seconds: float = 300.0, poll_interval: float = 0.2,
+                 url_ttl_seconds: Optional[float] = 24 * 3600):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.url_ttl_seconds = url_ttl_seconds
+        self.stats = {"hits": 0, "computed": 0, "waited": 0}
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS job_artifacts (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                value TEXT,
+                owner TEXT,
+                lease_until REAL,
+                updated_at REAL,
+                PRIMARY KEY (kind, key)
+            )""")
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers proceed while a writer commits"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def content_key(text: str) -> str:
+        """Key for job text: whitespace- and case-insensitive"""
+        normalized = ' '.join(text.split()).lower()
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    @classmethod
+    def is_tracking_param(cls, name: str) -> bool:
+        """True for query parameters that don't change which posting a URL points to"""
+        name = name.lower()
+        return name in cls.TRACKING_PARAMS or name.startswith(cls.TRACKING_PREFIXES)
+
+    @classmethod
+    def url_key(cls, url: str) -> str:
+        """Key for a job URL, ignoring fragments, tracking parameters and host case"""
+        parts = urlsplit(url.strip())
+        query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query)
+                                 if not cls.is_tracking_param(k)))
+        normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                                 parts.path.rstrip('/'), query, ''))
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _expired(self, kind: str, updated_at: Optional[float]) -> bool:
+        if kind not in self.URL_KINDS or self.url_ttl_seconds is None:
+            return False
+        return (updated_at or 0) < time.time() - self.url_ttl_seconds
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        """Return a ready, unexpired artifact, or None"""
+        row = self._connect().execute(
+            "SELECT value, updated_at FROM job_artifacts WHERE kind = ? AND key = ? AND status = 'ready'",
+            (kind, key)
+        ).fetchone()
+        if row is None or self._expired(kind, row[1]):
+            return None
+        return json.loads(row[0])
+
+    def put(self, kind: str, key: str, value: Any):
+        """Store an artifact computed elsewhere (e.g. by a message batch)"""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO job_artifacts (kind, key, status, value, owner, lease_until, updated_at) "
+            "VALUES (?, ?, 'ready', ?, NULL, 0, ?)",
+            (kind, key, json.dumps(value), time.time())
+        )
+
+    def _claim(self, kind: str, key: str, owner: str) -> Optional[tuple]:
+        """Try to take the compute lease; returns ("ready", value), ("claimed", None) or None"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT status, value, lease_until, updated_at FROM job_artifacts WHERE kind = ? AND key = ?",
+                (kind, key)
+            ).fetchone()
+            if row and row[0] == 'ready' and not self._expired(kind, row[3]):
+                conn.execute("COMMIT")
+                return ("ready", json.loads(row[1]))
+            if row and row[2] > now:
+                # Someone else is computing it and their lease is still live
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "INSERT OR REPLACE INTO job_artifacts (kind, key, status, value, owner, lease_until, updated_at) "
+                "VALUES (?, ?, 'pending', NULL, ?, ?, ?)",
+                (kind, key, owner, now + self.lease_seconds, now)
+            )
+            conn.execute("COMMIT")
+            return ("claimed", None)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_or_compute(self, kind: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the artifact, computing it exactly once across all concurrent callers"""
+        value = self.get(kind, key)
+        if value is not None:
+            self._count("hits")
+            return value
+
+        owner = f"{os.getpid()}:{threading.get_ident()}:{uuid.uuid4().hex[:8]}"
+        waited = False
+        while True:
+            claim = self._claim(kind, key, owner)
+            if claim is None:
+                waited = True
+                time.sleep(self.poll_interval)
+                continue
+            status, value = claim
+            if status == "ready":
+                self._count("waited" if waited else "hits")
+                return value
+            break
+
+        conn = self._connect()
+        try:
+            value = compute()
+        except Exception:
+            # Release the lease so a waiting caller can retry straight away
+            conn.execute("DELETE FROM job_artifacts WHERE kind = ? AND key = ? AND owner = ?",
+                         (kind, key, owner))
+            raise
+
+        conn.execute(
+            "UPDATE job_artifacts SET status = 'ready', value = ?, lease_until = 0, updated_at = ? "
+            "WHERE kind = ? AND key = ?",
+            (json.dumps(value), time.time(), kind, key)
+        )
+        self._count("computed")
+        return value
+
+
+class ResumeDiff:
+    """Section-level change detection between two versions of a resume"""
+
+    # Match categories each resume section feeds into
+    SECTION_CATEGORIES = {
+        "summary": ["soft_skills", "experience"],
+        "experience": ["experience", "technical_skills", "soft_skills"],
+        "skills": ["technical_skills"],
+        "projects": ["technical_skills", "experience"],
+        "education": ["qualifications"],
+        "certifications": ["qualifications"],
+        "publications": ["qualifications"],
+    }
+
+    @staticmethod
+    def changed_sections(old_text: str, new_text: str) -> List[str]:
+        """Section keys whose content differs (ignoring whitespace)"""
+        old_sections = ResumeSectionParser.parse(old_text)
+        new_sections = ResumeSectionParser.parse(new_text)
+
+        def normalized(sections: Dict[str, str], key: str) -> List[str]:
+            return [' '.join(line.split()) for line in sections.get(key, '').split('\n') if line.strip()]
+
+        keys = list(new_sections) + [key for key in old_sections if key not in new_sections]
+        return [key for key in keys
+                if normalized(old_sections, key) != normalized(new_sections, key)]
+
+    @classmethod
+    def touched_categories(cls, sections: List[str]) -> List[str]:
+        """Match categories affected by changes to the given sections"""
+        categories: List[str] = []
+        for section in sections:
+            for category in cls.SECTION_CATEGORIES.get(section, []):
+                if category not in categories:
+                    categories.append(category)
+        return categories
+
+
+class TailoringHistory:
+    """Record of every job a resume was tailored for, so edits can be propagated cheaply
+
+    Stored in SQLite, one row per (resume, job), when a path is given: recording a job is a
+    single upsert and several processes can share the file. Without a path it is kept in
+    memory for the lifetime of the process.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._targets: Dict[str, Dict[str, Dict]] = {}
+        self._local = threading.local()
+        if path:
+            self._connect().execute("""CREATE TABLE IF NOT EXISTS targets (
+                resume TEXT NOT NULL,
+                job_key TEXT NOT NULL,
+                job TEXT NOT NULL,
+                updated_at REAL,
+                PRIMARY KEY (resume, job_key)
+            )""")
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers proceed while a writer commits"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _resume_key(resume_path: str) -> str:
+        return os.path.abspath(resume_path)
+
+    def record(self, resume_path: str, job: Dict):
+        """Remember (or replace) the artifacts produced for one job"""
+        job_key = SharedJobStore.content_key(job['job_description'])
+        if self.path:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO targets (resume, job_key, job, updated_at) VALUES (?, ?, ?, ?)",
+                (self._resume_key(resume_path), job_key, json.dumps(job), time.time())
+            )
+            return
+        with self._lock:
+            self._targets.setdefault(self._resume_key(resume_path), {})[job_key] = job
+
+    def targets(self, resume_path: str) -> List[Dict]:
+        """Every job recorded for this resume"""
+        if self.path:
+            rows = self._connect().execute(
+                "SELECT job FROM targets WHERE resume = ? ORDER BY updated_at",
+                (self._resume_key(resume_path),)
+            ).fetchall()
+            return [json.loads(row[0]) for row in rows]
+        with self._lock:
+            return list(self._targets.get(self._resume_key(resume_path), {}).values())
+
+
+class ArtifactStore:
+    """Base class for places generated artifacts (PDF, markdown, reports) are kept"""
+
+    @staticmethod
+    def _new_id(name: str) -> str:
+        """Unique artifact ID, so concurrent runs never collide on a filename"""
+        stem, ext = os.path.splitext(name)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"{stem}_{timestamp}_{uuid.uuid4().hex[:8]}{ext}"
+
+    def put(self, name: str, data: bytes) -> str:
+        """Store an artifact and return its ID"""
+        raise NotImplementedError
+
+    def open(self, artifact_id: str) -> BinaryIO:
+        """Open an artifact for streaming"""
+        raise NotImplementedError
+
+    def get(self, artifact_id: str) -> bytes:
+        """Read an artifact's full contents"""
+        with self.open(artifact_id) as f:
+            return f.read()
+
+
+class LocalArtifactStore(ArtifactStore):
+    """Artifact store writing uniquely named files into a directory"""
+
+    def __init__(self, directory: str = "."):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, name: str, data: bytes) -> str:
+        """Write the artifact to disk; the ID is its file path"""
+        path = os.path.join(self.directory, self._new_id(name))
+        with open(path, 'xb') as f:
+            f.write(data)
+        return path
+
+    def open(self, artifact_id: str) -> BinaryIO:
+        """Open the artifact file for reading"""
+        return open(artifact_id, 'rb')
+
+
+class InMemoryArtifactStore(ArtifactStore):
+    """Artifact store keeping everything in memory, for service callers that stream results"""
+
+    def __init__(self):
+        self._artifacts: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def put(self, name: str, data: bytes) -> str:
+        """Keep the artifact in memory and return its ID"""
+        artifact_id = self._new_id(name)
+        with self._lock:
+            self._artifacts[artifact_id] = bytes(data)
+        return artifact_id
+
+    def open(self, artifact_id: str) -> BinaryIO:
+        """Return a read-only view of the artifact as a stream"""
+        with self._lock:
+            data = self._artifacts[artifact_id]
+        return io.BytesIO(data)
+
+    def pop(self, artifact_id: str) -> bytes:
+        """Remove an artifact once it has been handed to the caller"""
+        with self._lock:
+            return self._artifacts.pop(artifact_id)
+
+
+class ModelRouter:
+    """Routing policy deciding which model and temperature each agent runs on"""
+
+    TIERS = {
+        "fast": {"model": "claude-haiku-4-5-20251001", "temperature": 0.0},
+        "large": {"model": "claude-sonnet-4-5-20250929", "temperature": 0.7},
+    }
+    # Structured extraction and scoring don't need the big model; writing does
+    DEFAULT_ROUTES = {
+        "keywords": "fast",
+        "match": "fast",
+        "tailor": "large",
+        "recruiter": "large",
+    }
+    ESCALATION_TIER = "large"
+
+    def __init__(self, routes: Optional[Dict[str, Union[str, Dict]]] = None):
+        """Routes map agent name to a tier name or an explicit {"model", "temperature"} dict"""
+        self.routes = dict(self.DEFAULT_ROUTES)
+        self.routes.update(routes or {})
+
+    def config_for(self, agent: str) -> Dict:
+        """Model and temperature for an agent"""
+        route = self.routes[agent]
+        if isinstance(route, str):
+            return dict(self.TIERS[route])
+        return {"temperature": self.TIERS["large"]["temperature"], **route}
+
+    def escalation_for(self, agent: str) -> Optional[Dict]:
+        """Model to retry with when the routed model's answer looks unreliable"""
+        escalation = dict(self.TIERS[self.ESCALATION_TIER])
+        if escalation["model"] == self.config_for(agent)["model"]:
+            return None
+        return escalation
+
+
+class AgentUsageTracker:
+    """Collects per-agent LLM latency, token usage and cost"""
+
+    # USD per million tokens (input, output)
+    PRICING = {
+        "claude-haiku-4-5-20251001": (1.0, 5.0),
+        "claude-sonnet-4-5-20250929": (3.0, 15.0),
+    }
+
+    def __init__(self):
+        self.stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, agent: str) -> Dict:
+        return self.stats.setdefault(agent, {
+            "models": [], "calls": 0, "escalations": 0, "llm_seconds": 0.0,
+            "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0,
+        })
+
+    def record_call(self, agent: str, model: str, seconds: float,
+                    input_tokens: int, output_tokens: int, price_multiplier: float = 1.0):
+        """Record one completed LLM call"""
+        input_price, output_price = self.PRICING.get(model, (0.0, 0.0))
+        input_price *= price_multiplier
+        output_price *= price_multiplier
+        with self._lock:
+            entry = self._entry(agent)
+            if model not in entry["models"]:
+                entry["models"].append(model)
+            entry["calls"] += 1
+            entry["llm_seconds"] += seconds
+            entry["input_tokens"] += input_tokens
+            entry["output_tokens"] += output_tokens
+            entry["cost_usd"] += (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    def record_escalation(self, agent: str):
+        """Record that an agent's answer was retried on the larger model"""
+        with self._lock:
+            self._entry(agent)["escalations"] += 1
+
+    def total_llm_seconds(self) -> float:
+        """Seconds spent waiting on the LLM across all agents so far"""
+        with self._lock:
+            return sum(entry["llm_seconds"] for entry in self.stats.values())
+
+    def report(self) -> Dict[str, Dict]:
+        """Snapshot of the collected stats, rounded for display and reports"""
+        with self._lock:
+            return {
+                agent: {**entry, "llm_seconds": round(entry["llm_seconds"], 2),
+                        "cost_usd": round(entry["cost_usd"], 5)}
+                for agent, entry in self.stats.items()
+            }
+
+
+class AgentUsageCallback(BaseCallbackHandler):
+    """LangChain callback feeding one agent's LLM calls into an AgentUsageTracker"""
+
+    def __init__(self, agent: str, model: str, tracker: AgentUsageTracker):
+        self.agent = agent
+        self.model = model
+        self.tracker = tracker
+        self._started: Dict = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        seconds = time.perf_counter() - started if started is not None else 0.0
+
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+
+        self.tracker.record_call(self.agent, self.model, seconds, input_tokens, output_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+
+
 class LangChainResumeAgentUI:
     """Main orchestrator with Rich UI for the agentic resume workflow"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    AGENT_CLASSES = {
+        "keywords": KeywordExtractorAgent,
+        "match": MatchScoreAgent,
+        "tailor": ResumeTailoringAgent,
+        "recruiter": RecruiterEvaluationAgent,
+    }
+
+    def __init__(self, api_key: Optional[str] = None, bullets_per_role: Optional[int] = 6,
+                 artifact_store: Optional[ArtifactStore] = None,
+                 routing: Optional[Dict[str, Union[str, Dict]]] = None,
+                 escalate_on_low_confidence: bool = True,
+                 job_store: Optional[SharedJobStore] = None,
+                 speculative_evaluation: bool = False,
+                 scheduler: Optional[LLMScheduler] = None,
+                 priority: str = "interactive", user_id: str = "default",
+                 deadline_seconds: Optional[float] = None,
+                 profiler: Optional[StageProfiler] = None,
+                 record_history: Optional[bool] = None):
         """Initialize the multi-agent system"""
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not found")
 
-        self.llm = ChatAnthropic(
-            model="claude-sonnet-4-5-20250929",
+        # Bullets kept per role before tailoring (None sends the full resume)
+        self.bullets_per_role = bullets_per_role
+
+        # Shared scheduler for LLM calls; this instance's calls run at the given priority,
+        # each due within deadline_seconds of being queued (None: no deadline)
+        self.scheduler = scheduler
+        self.priority = priority
+        self.user_id = user_id
+        self.deadline_seconds = deadline_seconds
+
+        # Per-agent model routing, with an optional retry on the large model
+        self.router = ModelRouter(routing)
+        self.usage = AgentUsageTracker()
+        self.escalate_on_low_confidence = escalate_on_low_confidence
+        self._fallback_agents: Dict[str, object] = {}
+
+        self.keyword_agent = KeywordExtractorAgent(self._build_llm("keywords"))
+        self.match_agent = MatchScoreAgent(self._build_llm("match"))
+        self.tailor_agent = ResumeTailoringAgent(self._build_llm("tailor"))
+        self.recruiter_agent = RecruiterEvaluationAgent(self._build_llm("recruiter"))
+        self.pdf_generator = ResumePDFGenerator()
+        self.page_fitter = ResumePageFitter(max_pages=2)
+        self.artifact_store = artifact_store or LocalArtifactStore()
+        self.resume_cache = ResumeCache
+        self.section_cache = TailoredSectionCache
+
+        # Jobs tailored per resume, for diff-based refreshes (set RESUME_HISTORY to persist).
+        # Batch runs only record when asked, so memory stays flat over a large corpus
+        self.history = TailoringHistory(os.getenv('RESUME_HISTORY'))
+        self.record_history = priority == "interactive" if record_history is None else record_history
+
+        # Start Agent 4 on the streamed draft; track how often the draft had to be re-evaluated
+        self.speculative_evaluation = speculative_evaluation
+        self.speculation_stats = {"runs": 0, "kept": 0, "rerun": 0, "not_started": 0}
+
+        # Job-level artifacts shared across users (set RESUME_JOB_STORE to a SQLite path)
+        store_path = os.getenv('RESUME_JOB_STORE')
+        self.job_store = job_store or (SharedJobStore(store_path) if store_path else None)
+
+        # Per-stage profiling for --profile runs; disabled it only passes stages through
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.profiler.llm_seconds = self.usage.total_llm_seconds
+
+    def _build_llm(self, agent: str, config: Optional[Dict] = None) -> Runnable:
+        """Create the chat model an agent is routed to, reporting usage to the tracker"""
+        config = config or self.router.config_for(agent)
+        llm = ChatAnthropic(
+            model=config["model"],
             anthropic_api_key=self.api_key,
-            temperature=0.7
+            temperature=config["temperature"],
+            callbacks=[AgentUsageCallback(agent, config["model"], self.usage)]
         )
+        if self.scheduler is not None:
+            return ScheduledLLM(llm, self.scheduler, self.priority, self.user_id,
+                                self.deadline_seconds)
+        return llm
+
+    def _fallback_agent(self, agent: str):
+        """Same agent on the escalation model, created on first use"""
+        if agent not in self._fallback_agents:
+            config = self.router.escalation_for(agent)
+            self._fallback_agents[agent] = (
+                self.AGENT_CLASSES[agent](self._build_llm(agent, config)) if config else None
+            )
+        return self._fallback_agents[agent]
+
+    def _run_with_escalation(self, agent: str, primary, call: Callable,
+                             is_confident: Callable[[Dict], bool]) -> Dict:
+        """Run an agent call, retrying on the large model if the answer looks unreliable"""
+        try:
+            result = call(primary)
+            if not self.escalate_on_low_confidence or is_confident(result):
+                return result
+        except OutputParserException:
+            if not self.escalate_on_low_confidence or self._fallback_agent(agent) is None:
+                raise
+            result = None
+
+        fallback = self._fallback_agent(agent)
+        if fallback is None:
+            return result
+
+        self.usage.record_escalation(agent)
+        return call(fallback)
 
-        self.keyword_agent = KeywordExtractorAgent(self.llm)
-        self.match_agent = MatchScoreAgent(self.llm)
-        self.tailor_agent = ResumeTailoringAgent(self.llm)
-        self.recruiter_agent = RecruiterEvaluationAgent(self.llm)
-        self.pdf_generator = ResumePDFGenerator()
-        self.resume_cache = ResumeCache
+    @staticmethod
+    def keywords_confident(keywords: Dict) -> bool:
+        """Keyword extraction looks usable if it found a handful of terms"""
+        if not isinstance(keywords, dict):
+            return False
+        total = sum(len(values) for values in keywords.values() if isinstance(values, list))
+        return total >= 3
+
+    @staticmethod
+    def match_confident(match_analysis: Dict) -> bool:
+        """Match analysis looks usable if it is complete and internally consistent"""
+        try:
+            overall = float(match_analysis['overall_match_percentage'])
+            categories = [float(score) for score in match_analysis['category_scores'].values()]
+            match_analysis['strengths'], match_analysis['gaps'], match_analysis['recommendation']
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return False
+        if not categories or not 0 <= overall <= 100:
+            return False
+        # An overall score far from every category score is a sign of a sloppy answer
+        return abs(overall - sum(categories) / len(categories)) <= 25
+
+    def extract_keywords(self, job_description: str) -> Dict:
+        """Agent 1 with low-confidence escalation, shared across users via the job store"""
+        def extract() -> Dict:
+            return self._run_with_escalation(
+                "keywords", self.keyword_agent,
+                lambda agent: agent.extract(job_description),
+                self.keywords_confident
+            )
+
+        if self.job_store is None:
+            return extract()
+        return self.job_store.get_or_compute(
+            "keywords", SharedJobStore.content_key(job_description), extract
+        )
+
+    def calculate_match(self, job_description: str, resume: str, keywords: Dict) -> Dict:
+        """Agent 2 with low-confidence escalation"""
+        return self._run_with_escalation(
+            "match", self.match_agent,
+            lambda agent: agent.calculate_match(job_description, resume, keywords),
+            self.match_confident
+        )
 
     def load_resume(self, resume_path: str) -> str:
         """Load resume from PDF or text file, using cache if available"""
@@ -436,6 +1767,214 @@ class LangChainResumeAgentUI:
         self.resume_cache.set(resume_path, content)
         return content
 
+    def load_resume_sections(self, resume_path: str) -> Dict[str, str]:
+        """Load resume as a section-indexed mapping (header, summary, experience, ...)"""
+        return ResumeSectionParser.parse(self.load_resume(resume_path))
+
+    def tailor_resume(self, job_description: str, resume: str, keywords: Dict,
+                      match_analysis: Dict) -> tuple:
+        """Agent 3: returns (tailored resume, speculative evaluator or None)"""
+        # Preselect the most relevant bullets locally so the agent reads less
+        source_resume = resume
+        if self.bullets_per_role:
+            source_resume = BulletIndex(resume).select(keywords, self.bullets_per_role)
+
+        stable_sections = self.section_cache.get(resume)
+        speculator = None
+        if self.speculative_evaluation:
+            speculator = SpeculativeRecruiterEvaluator(
+                self.recruiter_agent, job_description, match_analysis, stable_sections
+            )
+
+        tailored_resume = self.tailor_agent.create_resume(
+            job_description, source_resume, keywords, match_analysis,
+            stable_sections=stable_sections,
+            on_chunk=speculator.feed if speculator else None
+        )
+        if speculator:
+            speculator.finish(tailored_resume)
+        if stable_sections is None:
+            self.section_cache.set(resume, tailored_resume)
+
+        return self.fit_to_pages(tailored_resume), speculator
+
+    def evaluate_candidacy(self, job_description: str, tailored_resume: str, match_analysis: Dict,
+                           speculator: Optional[SpeculativeRecruiterEvaluator] = None) -> tuple:
+        """Agent 4: returns (evaluation, speculation report or None)"""
+        if speculator and speculator.started:
+            evaluation, speculation = speculator.resolve(tailored_resume)
+            self.record_speculation(speculation)
+            return evaluation, speculation
+
+        evaluation = self.recruiter_agent.evaluate_candidacy(
+            job_description, tailored_resume, match_analysis
+        )
+        if speculator:
+            # The draft never got far enough to start on (e.g. no Experience section found)
+            speculation = {"started": False}
+            self.record_speculation(speculation)
+            return evaluation, speculation
+        return evaluation, None
+
+    def save_resume(self, tailored_resume: str) -> tuple:
+        """Store the tailored resume as PDF and markdown; returns (pdf ID, markdown ID)"""
+        pdf_path = self.artifact_store.put(
+            "tailored_resume.pdf", self.pdf_generator.convert_to_pdf(tailored_resume)
+        )
+        md_path = self.artifact_store.put("tailored_resume.md", tailored_resume.encode('utf-8'))
+        return pdf_path, md_path
+
+    def save_report(self, report: Dict) -> str:
+        """Store the analysis report; returns its artifact ID"""
+        return self.artifact_store.put(
+            "resume_analysis.json", json.dumps(report, indent=2).encode('utf-8')
+        )
+
+    def run_job(self, job_description: str, resume_path: str, job_url: str = "Manual input") -> Dict:
+        """Run the 4-agent workflow without any UI output, for batch workers"""
+        resume = self.load_resume(resume_path)
+        keywords = self.extract_keywords(job_description)
+        match_analysis = self.calculate_match(job_description, resume, keywords)
+        tailored_resume, speculator = self.tailor_resume(
+            job_description, resume, keywords, match_analysis
+        )
+        pdf_path, md_path = self.save_resume(tailored_resume)
+        recruiter_evaluation, speculation = self.evaluate_candidacy(
+            job_description, tailored_resume, match_analysis, speculator
+        )
+
+        report_path = self.save_report({
+            'job_url': job_url,
+            'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S"),
+            'keywords': keywords,
+            'match_analysis': match_analysis,
+            'recruiter_evaluation': recruiter_evaluation,
+            'speculation': speculation
+        })
+        if self.record_history:
+            self.remember_target(resume_path, resume, job_description, job_url, keywords,
+                                 match_analysis, tailored_resume, recruiter_evaluation)
+        return {
+            'job_url': job_url,
+            'match_percentage': match_analysis['overall_match_percentage'],
+            'candidacy_score': recruiter_evaluation['candidacy_score'],
+            'pdf': pdf_path,
+            'md': md_path,
+            'report': report_path
+        }
+
+    def remember_target(self, resume_path: str, resume: str, job_description: str, job_url: str,
+                        keywords: Dict, match_analysis: Dict, tailored_resume: str,
+                        recruiter_evaluation: Dict):
+        """Record a finished job so later resume edits can be propagated to it"""
+        self.history.record(resume_path, {
+            'job_description': job_description,
+            'job_url': job_url,
+            'resume': resume,
+            'keywords': keywords,
+            'match_analysis': match_analysis,
+            'tailored_resume': tailored_resume,
+            'recruiter_evaluation': recruiter_evaluation
+        })
+
+    def refresh_job(self, resume_path: str, resume: str, target: Dict,
+                    new_stable: Optional[Dict[str, str]] = None) -> Dict:
+        """Recompute only what a resume edit affects for one previously tailored job"""
+        job_description = target['job_description']
+        keywords = target['keywords']
+        changed = ResumeDiff.changed_sections(target['resume'], resume)
+        outcome = {'job_url': target['job_url'], 'changed_sections': changed,
+                   'rescored_categories': [], 'regenerated_sections': []}
+        if not changed:
+            return outcome
+
+        # Match scores: only the categories fed by the changed sections
+        match_analysis = target['match_analysis']
+        categories = [c for c in ResumeDiff.touched_categories(changed)
+                      if c in match_analysis.get('category_scores', {})]
+        if categories:
+            match_analysis = self.match_agent.rescore_categories(
+                job_description, resume, keywords, match_analysis, categories
+            )
+            outcome['rescored_categories'] = categories
+
+        # Tailored sections: only those whose job-specific source actually changed
+        old_source, new_source = target['resume'], resume
+        if self.bullets_per_role:
+            old_source = BulletIndex(old_source).select(keywords, self.bullets_per_role)
+            new_source = BulletIndex(new_source).select(keywords, self.bullets_per_role)
+        stale = [key for key in ResumeDiff.changed_sections(old_source, new_source)
+                 if key in ResumeSectionParser.TAILORED_SECTIONS]
+
+        tailored_resume = target['tailored_resume']
+        kept = ResumeSectionParser.parse(tailored_resume)
+        if new_stable:
+            # Replace the stable sections wholesale, so ones deleted from the resume go too
+            kept = {key: value for key, value in kept.items()
+                    if not ResumeSectionParser.is_stable(key)}
+            kept.update(new_stable)
+        if stale:
+            kept = {key: value for key, value in kept.items() if key not in stale}
+            tailored_resume = self.tailor_agent.create_sections(
+                job_description, new_source, keywords, match_analysis, kept, sections=stale
+            )
+            outcome['regenerated_sections'] = stale
+        elif new_stable:
+            tailored_resume = ResumeSectionParser.assemble(kept)
+
+        recruiter_evaluation = target['recruiter_evaluation']
+        if tailored_resume != target['tailored_resume']:
+            tailored_resume = self.fit_to_pages(tailored_resume)
+            outcome['pdf'], outcome['md'] = self.save_resume(tailored_resume)
+            recruiter_evaluation = self.recruiter_agent.evaluate_candidacy(
+                job_description, tailored_resume, match_analysis
+            )
+
+        outcome['report'] = self.save_report({
+            'job_url': target['job_url'],
+            'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S"),
+            'keywords': keywords,
+            'match_analysis': match_analysis,
+            'recruiter_evaluation': recruiter_evaluation,
+            'refresh': {key: outcome[key] for key in
+                        ('changed_sections', 'rescored_categories', 'regenerated_sections')}
+        })
+        outcome['match_percentage'] = match_analysis['overall_match_percentage']
+        self.remember_target(resume_path, resume, job_description, target['job_url'], keywords,
+                             match_analysis, tailored_resume, recruiter_evaluation)
+        return outcome
+
+    def refresh_targets(self, resume_path: str) -> List[Dict]:
+        """After a resume edit, update every job it was tailored for, recomputing only what changed"""
+        resume = self.load_resume(resume_path)
+        targets = self.history.targets(resume_path)
+
+        # Stable sections (header, education, ...) are job-independent: regenerate them once
+        new_stable = None
+        stable_changed = any(
+            ResumeSectionParser.is_stable(key)
+            for target in targets for key in ResumeDiff.changed_sections(target['resume'], resume)
+        )
+        if stable_changed and targets:
+            new_stable = self.tailor_agent.create_stable_sections(resume)
+            self.section_cache.set(resume, ResumeSectionParser.assemble(new_stable))
+
+        return [self.refresh_job(resume_path, resume, target, new_stable) for target in targets]
+
+    def fit_to_pages(self, resume_text: str) -> str:
+        """Make sure the tailored resume fits the page limit, trimming locally first"""
+        if self.page_fitter.fits(resume_text):
+            return resume_text
+
+        trimmed = self.page_fitter.trim(resume_text)
+        if self.page_fitter.fits(trimmed):
+            return trimmed
+
+        # Local trimming ran out of options: one targeted shorten call, then a final local pass
+        layout = self.pdf_generator.measure(trimmed, self.page_fitter.max_pages)
+        shortened = self.tailor_agent.shorten_resume(trimmed, layout["overflow_lines"])
+        return self.page_fitter.trim(shortened)
+
     def display_keywords(self, keywords: Dict):
         """Display extracted keywords in a nice table"""
         table = Table(title="📋 Extracted Keywords", box=box.ROUNDED, show_header=True, header_style="bold magenta")
@@ -527,6 +2066,144 @@ class LangChainResumeAgentUI:
         console.print(Panel(match_analysis['recommendation'], title="💡 Recommendation", border_style="blue"))
         console.print()
 
+    def display_usage(self):
+        """Display per-agent model, LLM latency and cost"""
+        usage = self.usage.report()
+        if not usage:
+            return
+
+        table = Table(title="⏱ Agent Latency & Cost", box=box.ROUNDED)
+        table.add_column("Agent", style="cyan")
+        table.add_column("Model", style="white")
+        table.add_column("Calls", justify="right")
+        table.add_column("LLM Time", justify="right", style="magenta")
+        table.add_column("Tokens In/Out", justify="right")
+        table.add_column("Cost", justify="right", style="green")
+
+        for agent, stats in usage.items():
+            calls = str(stats['calls'])
+            if stats['escalations']:
+                calls += f" ({stats['escalations']} escalated)"
+            table.add_row(
+                agent.title(),
+                ", ".join(model.replace("claude-", "") for model in stats['models']),
+                calls,
+                f"{stats['llm_seconds']:.1f}s",
+                f"{stats['input_tokens']}/{stats['output_tokens']}",
+                f"${stats['cost_usd']:.4f}"
+            )
+
+        console.print(table)
+        console.print()
+
+    def display_profile(self, top: int = 15):
+        """Display per-stage time split and the hottest functions outside LLM / network waits"""
+        summary = self.profiler.summary()
+        if not summary:
+            return
+
+        table = Table(title="🔬 Stage Profile", box=box.ROUNDED)
+        table.add_column("Stage", style="cyan")
+        table.add_column("Wall", justify="right")
+        table.add_column("LLM Wait", justify="right", style="magenta")
+        table.add_column("Local", justify="right", style="yellow")
+        table.add_column("Local CPU", justify="right")
+        table.add_column("Peak Mem", justify="right", style="green")
+
+        for stage, stats in summary.items():
+            table.add_row(
+                stage + (f" (×{stats['entries']})" if stats['entries'] > 1 else ""),
+                f"{stats['wall_seconds']:.2f}s",
+                f"{stats['llm_seconds']:.2f}s",
+                f"{stats['local_seconds']:.2f}s",
+                f"{stats['local_cpu_seconds']:.2f}s",
+                f"{stats['peak_kib'] / 1024:.1f} MiB"
+            )
+
+        console.print(table)
+        console.print()
+
+        hottest = Table(title="🔥 Hottest Local Functions (self time, waits excluded)", box=box.ROUNDED)
+        hottest.add_column("#", justify="right", style="dim")
+        hottest.add_column("Function", style="white")
+        hottest.add_column("Stage", style="cyan")
+        hottest.add_column("Calls", justify="right")
+        hottest.add_column("Self", justify="right", style="yellow")
+        hottest.add_column("Cumulative", justify="right")
+
+        for rank, row in enumerate(self.profiler.hottest(top), 1):
+            hottest.add_row(
+                str(rank), row['function'], row['stage'], str(row['calls']),
+                f"{row['self_seconds']:.3f}s", f"{row['cumulative_seconds']:.3f}s"
+            )
+
+        console.print(hottest)
+        console.print()
+
+    def finish_profile(self):
+        """Write the collected profiles and print the summary, if profiling is on"""
+        if not self.profiler.enabled:
+            return
+        paths = self.profiler.write()
+        self.profiler.close()
+        self.display_profile()
+        if paths:
+            console.print(f"[dim]Profiles (pstats, collapsed stacks, tracemalloc) written to "
+                          f"{self.profiler.output_dir}/[/dim]")
+
+    def record_speculation(self, speculation: Dict):
+        """Count whether the speculative evaluation was kept, re-run or never started"""
+        if not speculation["started"]:
+            self.speculation_stats["not_started"] += 1
+            return
+        self.speculation_stats["runs"] += 1
+        self.speculation_stats["rerun" if speculation["diverged"] else "kept"] += 1
+
+    def divergence_rate(self) -> float:
+        """Share of speculative evaluations that had to be re-run"""
+        runs = self.speculation_stats["runs"]
+        return self.speculation_stats["rerun"] / runs if runs else 0.0
+
+    def display_speculation(self, speculation: Dict):
+        """Display whether the speculative recruiter evaluation was kept"""
+        stats = self.speculation_stats
+        totals = (f"divergence rate {stats['rerun']}/{stats['runs']} = {self.divergence_rate():.0%}, "
+                  f"not started {stats['not_started']}")
+        if not speculation["started"]:
+            console.print(f"[dim]Speculative evaluation:[/dim] [yellow]not started[/yellow] "
+                          f"[dim]({totals})[/dim]")
+            console.print()
+            return
+
+        outcome = "[yellow]re-run on final resume[/yellow]" if speculation["diverged"] else "[green]kept[/green]"
+        console.print(
+            f"[dim]Speculative evaluation:[/dim] {outcome} "
+            f"[dim](core similarity {speculation['similarity']:.2f}, "
+            f"unseen {speculation['unseen_ratio']:.0%}; {totals})[/dim]"
+        )
+        console.print()
+
+    def display_refresh(self, outcomes: List[Dict]):
+        """Display what a resume refresh recomputed for each job"""
+        table = Table(title="🔄 Resume Refresh", box=box.ROUNDED)
+        table.add_column("Job", style="cyan")
+        table.add_column("Changed Sections", style="white")
+        table.add_column("Re-scored", style="magenta")
+        table.add_column("Regenerated", style="yellow")
+        table.add_column("Match", justify="right")
+
+        for outcome in outcomes:
+            table.add_row(
+                outcome['job_url'],
+                ", ".join(outcome['changed_sections']) or "[dim]none[/dim]",
+                ", ".join(outcome['rescored_categories']) or "-",
+                ", ".join(outcome['regenerated_sections']) or "[green]kept[/green]",
+                f"{outcome['match_percentage']}%" if 'match_percentage' in outcome else "-"
+            )
+
+        console.print(table)
+        console.print()
+
     def display_recruiter_evaluation(self, evaluation: Dict):
         """Display recruiter evaluation in a professional format"""
         score = evaluation['candidacy_score']
@@ -628,7 +2305,8 @@ class LangChainResumeAgentUI:
         # Load resume (uses cache if already parsed)
         console.print("[bold]Loading resume...[/bold]", style="dim")
         cached = self.resume_cache.get(resume_path) is not None
-        current_resume = self.load_resume(resume_path)
+        with self.profiler.stage("load_resume"):
+            current_resume = self.load_resume(resume_path)
         if cached:
             console.print(f"✓ Resume loaded from cache: [cyan]{os.path.basename(resume_path)}[/cyan]")
         else:
@@ -649,54 +2327,46 @@ class LangChainResumeAgentUI:
             task1 = progress.add_task("[cyan]Agent 1: Extracting keywords...", total=100)
             progress.update(task1, advance=20)
 
-            keywords = self.keyword_agent.extract(job_description)
+            with self.profiler.stage("extract_keywords"):
+                keywords = self.extract_keywords(job_description)
 
             progress.update(task1, advance=80, description="[green]✓ Agent 1: Keywords extracted")
             console.print()
 
-            self.display_keywords(keywords)
+            with self.profiler.stage("render"):
+                self.display_keywords(keywords)
 
             # Step 2: Calculate match
             task2 = progress.add_task("[yellow]Agent 2: Calculating match score...", total=100)
             progress.update(task2, advance=20)
 
-            match_analysis = self.match_agent.calculate_match(
-                job_description, current_resume, keywords
-            )
+            with self.profiler.stage("calculate_match"):
+                match_analysis = self.calculate_match(
+                    job_description, current_resume, keywords
+                )
 
             progress.update(task2, advance=80, description="[green]✓ Agent 2: Match score calculated")
             console.print()
 
-            self.display_match_score(match_analysis)
+            with self.profiler.stage("render"):
+                self.display_match_score(match_analysis)
 
             # Step 3: Create resume
             task3 = progress.add_task("[magenta]Agent 3: Generating tailored resume...", total=100)
             progress.update(task3, advance=20)
 
-            tailored_resume = self.tailor_agent.create_resume(
-                job_description, current_resume, keywords, match_analysis
-            )
+            with self.profiler.stage("tailor_resume"):
+                tailored_resume, speculator = self.tailor_resume(
+                    job_description, current_resume, keywords, match_analysis
+                )
 
             progress.update(task3, advance=60)
 
             # Save files
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-            pdf_path = f"tailored_resume_{timestamp}.pdf"
-            self.pdf_generator.convert_to_pdf(tailored_resume, pdf_path)
-
-            md_path = f"tailored_resume_{timestamp}.md"
-            with open(md_path, 'w', encoding='utf-8') as f:
-                f.write(tailored_resume)
-
-            report_path = f"resume_analysis_{timestamp}.json"
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'job_url': job_url,
-                    'timestamp': timestamp,
-                    'keywords': keywords,
-                    'match_analysis': match_analysis
-                }, f, indent=2)
+            with self.profiler.stage("convert_to_pdf"):
+                pdf_path, md_path = self.save_resume(tailored_resume)
 
             progress.update(task3, advance=20, description="[green]✓ Agent 3: Resume generated and saved")
 
@@ -704,22 +2374,35 @@ class LangChainResumeAgentUI:
             task4 = progress.add_task("[yellow]Agent 4: Senior recruiter evaluating candidacy...", total=100)
             progress.update(task4, advance=20)
 
-            recruiter_evaluation = self.recruiter_agent.evaluate_candidacy(
-                job_description, tailored_resume, match_analysis
-            )
+            with self.profiler.stage("evaluate_candidacy"):
+                recruiter_evaluation, speculation = self.evaluate_candidacy(
+                    job_description, tailored_resume, match_analysis, speculator
+                )
 
             progress.update(task4, advance=80, description="[green]✓ Agent 4: Recruiter evaluation complete")
 
         console.print()
 
-        self.display_recruiter_evaluation(recruiter_evaluation)
-
-        # Update report with recruiter evaluation
-        with open(report_path, 'r', encoding='utf-8') as f:
-            full_report = json.load(f)
-        full_report['recruiter_evaluation'] = recruiter_evaluation
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(full_report, f, indent=2)
+        with self.profiler.stage("render"):
+            self.display_recruiter_evaluation(recruiter_evaluation)
+            self.display_usage()
+            if speculation:
+                self.display_speculation(speculation)
+
+        # Full report, written once with the recruiter evaluation included
+        full_report = {
+            'job_url': job_url,
+            'timestamp': timestamp,
+            'keywords': keywords,
+            'match_analysis': match_analysis,
+            'recruiter_evaluation': recruiter_evaluation,
+            'agent_usage': self.usage.report(),
+            'speculation': speculation
+        }
+        report_path = self.save_report(full_report)
+        if self.record_history:
+            self.remember_target(resume_path, current_resume, job_description, job_url, keywords,
+                                 match_analysis, tailored_resume, recruiter_evaluation)
 
         # Summary
         console.print(Panel(
@@ -743,8 +2426,10 @@ def main():
     import sys
 
     if len(sys.argv) < 2:
-        console.print("[red]Usage:[/red] python langchain_resume_agent_ui.py <resume_file>")
+        console.print("[red]Usage:[/red] python langchain_resume_agent_ui.py <resume_file> [--refresh] [--profile]")
         console.print("\nYou will be prompted to paste the job description.")
+        console.print("--refresh updates every job recorded in RESUME_HISTORY after a resume edit.")
+        console.print("--profile writes per-stage pstats, flamegraph stacks and tracemalloc snapshots.")
         sys.exit(1)
 
     resume_path = sys.argv[1]
@@ -753,6 +2438,19 @@ def main():
         console.print(f"[red]Error:[/red] Resume file not found: {resume_path}")
         sys.exit(1)
 
+    if "--refresh" in sys.argv[2:]:
+        if not os.getenv('RESUME_HISTORY'):
+            console.print("[red]Error:[/red] --refresh needs the tailoring history. "
+                          "Set RESUME_HISTORY (e.g. RESUME_HISTORY=history.db) for your runs, then refresh.")
+            sys.exit(1)
+        try:
+            agent = LangChainResumeAgentUI()
+            agent.display_refresh(agent.refresh_targets(resume_path))
+        except Exception as e:
+            console.print(f"\n[red]Error:[/red] {str(e)}")
+            sys.exit(1)
+        return
+
     console.print("\n[bold]Paste the job description below.[/bold]")
     console.print("[dim]When finished, press Ctrl+D (Mac/Linux) or Ctrl+Z then Enter (Windows):[/dim]")
     console.print("─" * 60)
@@ -775,9 +2473,14 @@ def main():
     if not job_url:
         job_url = "Manual input"
 
+    profiler = None
+    if "--profile" in sys.argv[2:]:
+        profiler = StageProfiler(f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
     try:
-        agent = LangChainResumeAgentUI()
+        agent = LangChainResumeAgentUI(profiler=profiler)
         agent.process(job_description, resume_path, job_url)
+        agent.finish_profile()
     except Exception as e:
         console.print(f"\n[red]Error:[/red] {str(e)}")
         import traceback
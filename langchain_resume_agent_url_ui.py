@@ -4,53 +4,74 @@ LangChain Resume Agent with URL support and Rich UI
 """
 
 import sys
+from datetime import datetime
+from typing import Optional
+
 import requests
 from bs4 import BeautifulSoup
-from langchain_resume_agent_ui import LangChainResumeAgentUI, console
-
+from langchain_resume_agent_ui import LangChainResumeAgentUI, SharedJobStore, StageProfiler, console
 
-def fetch_job_description(url: str) -> str:
-    """Fetch job description from URL"""
-    console.print(f"\n[bold]Fetching job description from URL...[/bold]")
-    console.print(f"[dim]{url}[/dim]\n")
 
+def fetch_html(url: str) -> str:
+    """Download the raw HTML of a job posting"""
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     }
 
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+    response = requests.get(url, headers=headers, timeout=10)
+    response.raise_for_status()
+    return response.text
+
+
+def extract_job_text(html: str) -> str:
+    """Pull the job description text out of a posting's HTML"""
+    soup = BeautifulSoup(html, 'html.parser')
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+    for script in soup(["script", "style", "nav", "footer", "header", "noscript"]):
+        script.decompose()
 
-        for script in soup(["script", "style", "nav", "footer", "header", "noscript"]):
-            script.decompose()
+    job_content = None
+    selectors = [
+        {'class': 'job-description'},
+        {'class': 'jobdescription'},
+        {'id': 'job-description'},
+        {'class': 'description'},
+        {'role': 'main'},
+    ]
 
-        job_content = None
-        selectors = [
-            {'class': 'job-description'},
-            {'class': 'jobdescription'},
-            {'id': 'job-description'},
-            {'class': 'description'},
-            {'role': 'main'},
-        ]
+    for selector in selectors:
+        job_content = soup.find('div', selector) or soup.find('section', selector)
+        if job_content:
+            break
 
-        for selector in selectors:
-            job_content = soup.find('div', selector) or soup.find('section', selector)
-            if job_content:
-                break
+    if not job_content:
+        job_content = soup.find('body') or soup
 
-        if not job_content:
-            job_content = soup.find('body') or soup
+    text = job_content.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = '\n'.join(chunk for chunk in chunks if chunk)
 
-        text = job_content.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
+    if len(text) > 20000:
+        text = text[:20000]
 
-        if len(text) > 20000:
-            text = text[:20000]
+    return text
+
+
+def fetch_job_description(url: str, job_store: Optional[SharedJobStore] = None) -> str:
+    """Fetch job description from URL, sharing the HTML and cleaned text via the job store"""
+    console.print(f"\n[bold]Fetching job description from URL...[/bold]")
+    console.print(f"[dim]{url}[/dim]\n")
+
+    try:
+        if job_store is None:
+            text = extract_job_text(fetch_html(url))
+        else:
+            key = SharedJobStore.url_key(url)
+            text = job_store.get_or_compute(
+                "job_text", key,
+                lambda: extract_job_text(job_store.get_or_compute("html", key, lambda: fetch_html(url)))
+            )
 
         console.print(f"[green]✓ Successfully fetched ({len(text)} characters)[/green]\n")
         return text
@@ -61,16 +82,22 @@ def fetch_job_description(url: str) -> str:
 
 def main():
     if len(sys.argv) < 3:
-        console.print("[red]Usage:[/red] python langchain_resume_agent_url_ui.py <job_url> <resume_file>")
+        console.print("[red]Usage:[/red] python langchain_resume_agent_url_ui.py <job_url> <resume_file> [--profile]")
         sys.exit(1)
 
     job_url = sys.argv[1]
     resume_path = sys.argv[2]
 
+    profiler = None
+    if "--profile" in sys.argv[3:]:
+        profiler = StageProfiler(f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
     try:
-        job_description = fetch_job_description(job_url)
-        agent = LangChainResumeAgentUI()
+        agent = LangChainResumeAgentUI(profiler=profiler)
+        with agent.profiler.stage("fetch_job_description"):
+            job_description = fetch_job_description(job_url, agent.job_store)
         agent.process(job_description, resume_path, job_url)
+        agent.finish_profile()
     except Exception as e:
         console.print(f"\n[red]Error:[/red] {str(e)}")
         sys.exit(1)
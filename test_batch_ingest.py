@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Regression tests for streaming ingestion (run with: python -m pytest test_batch_ingest.py)"""
+
+import os
+import json
+import threading
+
+from langchain_resume_agent_batch import StreamingIngestor
+
+
+def write_corpus(path, count):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(json.dumps({"id": f"job-{i}", "description": f"Python engineer number {i}"}) + "\n")
+
+
+def result_ids(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def test_run_chunks_with_more_records_than_pending_limit(tmp_path):
+    corpus = str(tmp_path / "jobs.jsonl")
+    write_corpus(corpus, 300)
+    ingestor = StreamingIngestor(str(tmp_path / "results.jsonl"), str(tmp_path / "checkpoint.json"),
+                                 queue_size=64)
+
+    outcome = {}
+    thread = threading.Thread(target=lambda: outcome.update(ingestor.run_chunks(
+        corpus, lambda records: [{"id": record["id"]} for record in records], chunk_size=1000)),
+        daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+
+    assert not thread.is_alive(), "run_chunks deadlocked"
+    assert outcome["processed"] == 300
+    assert len(result_ids(str(tmp_path / "results.jsonl"))) == 300
+
+
+def test_restart_after_crash_writes_each_record_once(tmp_path):
+    corpus = str(tmp_path / "jobs.jsonl")
+    results = str(tmp_path / "results.jsonl")
+    checkpoint = str(tmp_path / "checkpoint.json")
+    write_corpus(corpus, 200)
+
+    def crash_at_145(record):
+        if record["id"] == "job-145":
+            os._exit(3)  # Hard crash: no finally blocks, no final checkpoint
+        return {"padding": "x" * 400}  # Large enough that results reach disk between checkpoints
+
+    pid = os.fork()
+    if pid == 0:
+        StreamingIngestor(results, checkpoint, workers=4, queue_size=8, checkpoint_every=50).run(
+            corpus, crash_at_145)
+        os._exit(0)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 3
+
+    state = StreamingIngestor(results, checkpoint, workers=4, queue_size=8, checkpoint_every=50).run(
+        corpus, lambda record: {"ok": True})
+
+    ids = result_ids(results)
+    assert sorted(ids) == sorted(f"job-{i}" for i in range(200))
+    assert state["processed"] == 200
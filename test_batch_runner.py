@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Tests for message-batch waves (run with: python -m pytest test_batch_runner.py)"""
+
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import langchain_resume_agent_ui as ui
+from langchain_resume_agent_batch import BatchTailoringRunner, LocalBatchClient
+
+
+ANSWERS = {
+    "keywords": json.dumps({"technical_skills": ["Python", "AWS", "Docker"],
+                            "soft_skills": ["Leadership"]}),
+    "match": json.dumps({"overall_match_percentage": 80,
+                         "category_scores": {"technical_skills": 80, "experience": 85},
+                         "strengths": ["Python"], "gaps": ["Go"], "recommendation": "Apply"}),
+    "tailor": "# Jane Doe\njane@example.com\n\n## Professional Summary\nPython engineer.\n\n"
+              "## Experience\n### Engineer - Acme\n- Built Python services\n\n"
+              "## Education\n### BS Computer Science - MIT",
+    "recruiter": json.dumps({"candidacy_score": 82, "likelihood_to_proceed": "High"}),
+}
+
+
+class StrictBatchClient(LocalBatchClient):
+    """Local batch client that, like the real endpoint, rejects empty batches"""
+
+    def __init__(self, failing_stages=()):
+        super().__init__(self.answer)
+        self.failing_stages = failing_stages
+        self.stages = []
+
+    def submit(self, requests):
+        if not requests:
+            raise ValueError("requests: at least one request is required")
+        self.stages.append(requests[0]["custom_id"].rsplit("-", 1)[0])
+        return super().submit(requests)
+
+    def answer(self, params):
+        stage = self.stages[-1]
+        if stage in self.failing_stages:
+            raise RuntimeError(f"{stage} overloaded")
+        return ANSWERS[stage]
+
+
+@pytest.fixture
+def runner(monkeypatch, tmp_path):
+    monkeypatch.setattr(ui.LangChainResumeAgentUI, "_build_llm",
+                        lambda self, name, config=None: FakeListChatModel(responses=["unused"]))
+    monkeypatch.delenv("RESUME_JOB_STORE", raising=False)
+    ui.ResumeCache.clear()
+    ui.TailoredSectionCache.clear()
+
+    resume_path = str(tmp_path / "resume.md")
+    with open(resume_path, "w", encoding="utf-8") as f:
+        f.write("# Jane Doe\njane@example.com\n\n## Experience\n### Engineer - Acme\n"
+                "- Built Python services\n\n## Education\n### BS Computer Science - MIT")
+
+    def build(client):
+        agent = ui.LangChainResumeAgentUI(
+            api_key="test", artifact_store=ui.LocalArtifactStore(str(tmp_path / "out")))
+        return BatchTailoringRunner(agent, client, sleep=lambda seconds: None), resume_path
+
+    yield build
+    ui.ResumeCache.clear()
+    ui.TailoredSectionCache.clear()
+
+
+JOBS = [{"id": "a", "job_description": "Python engineer at Acme"},
+        {"id": "b", "job_description": "Python engineer at Acme"},
+        {"id": "c", "job_description": "Backend engineer at Initech"}]
+
+
+def test_runs_every_wave(runner):
+    client = StrictBatchClient()
+    batch, resume_path = runner(client)
+
+    results = batch.run(JOBS, resume_path)
+
+    assert client.stages == ["keywords", "match", "tailor", "recruiter"]
+    # The duplicate posting is only sent once for keywords
+    assert len(client.batches["local_batch_0"]["requests"]) == 2
+    assert [result["error"] for result in results] == [None, None, None]
+    assert [result["candidacy_score"] for result in results] == [82, 82, 82]
+    assert all(result["pdf"] and result["report"] for result in results)
+
+
+def test_all_jobs_failing_a_wave_skips_later_waves(runner):
+    client = StrictBatchClient(failing_stages=("match",))
+    batch, resume_path = runner(client)
+
+    results = batch.run(JOBS, resume_path)
+
+    assert "tailor" not in client.stages and "recruiter" not in client.stages
+    assert all(result["error"].startswith("match: ") for result in results)
+    assert all(result["pdf"] is None for result in results)
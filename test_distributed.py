@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Tests for the sharded task queue (run with: python -m pytest test_distributed.py)"""
+
+import json
+
+from langchain_resume_agent_distributed import DistributedBatchCoordinator
+
+
+def write_corpus(path, descriptions):
+    # No "id" field: records get generated offset-<N> IDs
+    with open(path, 'w', encoding='utf-8') as f:
+        for description in descriptions:
+            f.write(json.dumps({"description": description}) + "\n")
+
+
+def test_generated_ids_from_different_corpora_do_not_collide(tmp_path):
+    first, second = str(tmp_path / "first.jsonl"), str(tmp_path / "second.jsonl")
+    write_corpus(first, [f"Python engineer {i}" for i in range(5)])
+    write_corpus(second, [f"Data analyst {i}" for i in range(5)])
+    coordinator = DistributedBatchCoordinator(str(tmp_path / "queue.db"), ["shard-0", "shard-1"])
+
+    assert coordinator.enqueue(first)["queued"] == 5
+    assert coordinator.enqueue(second)["queued"] == 5
+    assert coordinator.queue.counts()["queued"] == 10
+
+    # Re-enqueueing a corpus is a no-op
+    again = coordinator.enqueue(first)
+    assert (again["queued"], again["duplicates"]) == (0, 5)
+
+    tasks = []
+    while True:
+        task = coordinator.queue.claim("worker", "shard-0")
+        if task is None:
+            break
+        tasks.append(task)
+    assert sorted(task["record"]["job_description"] for task in tasks) == sorted(
+        [f"Python engineer {i}" for i in range(5)] + [f"Data analyst {i}" for i in range(5)])
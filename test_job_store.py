@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""Tests for the shared job store (run with: python -m pytest test_job_store.py)"""
+
+from langchain_resume_agent_ui import SharedJobStore
+
+
+def test_url_key_ignores_tracking_parameters_only():
+    base = SharedJobStore.url_key("https://jobs.example.com/view?jobId=42")
+
+    assert SharedJobStore.url_key(
+        "https://JOBS.example.com/view/?utm_source=mail&jobId=42&ref=feed&source=li#apply") == base
+
+    # Parameters that merely start like a tracking one can select a different posting
+    for param in ("reference=7", "refId=7", "sourceJobId=7"):
+        assert SharedJobStore.url_key(f"https://jobs.example.com/view?jobId=42&{param}") != base
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Regression tests for diff-based refreshes (run with: python -m pytest test_refresh.py)"""
+
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import langchain_resume_agent_ui as ui
+
+
+RECRUITER = json.dumps({"candidacy_score": 80, "likelihood_to_proceed": "High",
+                        "recruiter_notes": "ok"})
+
+OLD_RESUME = """# Jane Doe
+jane@example.com
+
+## Experience
+### Engineer - Acme
+- Built Python services
+
+## Education
+### BS Computer Science - MIT
+
+## Certifications
+AWS Solutions Architect"""
+
+TAILORED = """# Jane Doe
+jane@example.com
+
+## Professional Summary
+Python engineer.
+
+## Experience
+### Engineer - Acme
+- Built Python services
+
+## Education
+### BS Computer Science - MIT
+
+## Certifications
+AWS Solutions Architect"""
+
+
+@pytest.fixture
+def agent(monkeypatch, tmp_path):
+    """Agent whose LLMs return canned answers: `responses[agent]` is a list per agent"""
+    responses = {"keywords": [], "match": [], "tailor": [], "recruiter": [RECRUITER] * 5}
+
+    def fake_build(self, name, config=None):
+        return FakeListChatModel(responses=responses[name] or ["unused"])
+
+    monkeypatch.delenv("RESUME_HISTORY", raising=False)
+    monkeypatch.setattr(ui.LangChainResumeAgentUI, "_build_llm", fake_build)
+    ui.ResumeCache.clear()
+    ui.TailoredSectionCache.clear()
+
+    def build(tailor_responses):
+        responses["tailor"] = tailor_responses
+        return ui.LangChainResumeAgentUI(
+            api_key="test", artifact_store=ui.LocalArtifactStore(str(tmp_path / "out")))
+
+    yield build
+    ui.ResumeCache.clear()
+    ui.TailoredSectionCache.clear()
+
+
+def remember(instance, resume_path):
+    instance.remember_target(resume_path, OLD_RESUME, "Python engineer at Acme", "job-1",
+                             {"technical_skills": ["Python"]},
+                             {"overall_match_percentage": 80, "category_scores": {}},
+                             TAILORED, json.loads(RECRUITER))
+
+
+def test_refresh_drops_stable_section_deleted_from_resume(agent, tmp_path):
+    resume_path = str(tmp_path / "resume.md")
+    with open(resume_path, "w", encoding="utf-8") as f:
+        f.write(OLD_RESUME.split("\n\n## Certifications")[0])
+
+    # Only the stable sections changed, so the refresh asks for those alone
+    instance = agent(["# Jane Doe\njane@example.com\n\n## Education\n### BS Computer Science - MIT"])
+    remember(instance, resume_path)
+
+    outcome, = instance.refresh_targets(resume_path)
+
+    assert outcome["changed_sections"] == ["certifications"]
+    assert outcome["regenerated_sections"] == []
+    tailored = instance.history.targets(resume_path)[0]["tailored_resume"]
+    assert "Certifications" not in tailored
+    assert "## Professional Summary" in tailored and "## Education" in tailored
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Tests for the LLM call scheduler (run with: python -m pytest test_scheduler.py)"""
+
+import threading
+import time
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from langchain_resume_agent_scheduler import LLMScheduler, ScheduledLLM
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def drain(scheduler):
+    """Dispatch and immediately release every queued call; return them in run order"""
+    order = []
+    while True:
+        call = scheduler.dispatch()
+        if call is None:
+            return order
+        order.append(call)
+        scheduler.release(call)
+
+
+def test_users_share_slots_fairly():
+    scheduler = LLMScheduler(max_concurrency=1, clock=SimulatedClock())
+    for _ in range(3):
+        scheduler.submit("batch", "alice")
+    for _ in range(3):
+        scheduler.submit("batch", "bob")
+
+    assert [call.user for call in drain(scheduler)] == ["alice", "bob"] * 3
+
+
+def test_user_weights_scale_the_share():
+    scheduler = LLMScheduler(max_concurrency=1, clock=SimulatedClock(), user_weights={"bob": 2.0})
+    for _ in range(4):
+        scheduler.submit("batch", "alice")
+    for _ in range(4):
+        scheduler.submit("batch", "bob")
+
+    order = [call.user for call in drain(scheduler)]
+    assert order[:6].count("bob") == 4
+
+
+def test_interactive_goes_before_batch():
+    clock = SimulatedClock()
+    scheduler = LLMScheduler(max_concurrency=1, clock=clock)
+    scheduler.submit("batch", "bulk")
+    scheduler.submit("batch", "bulk")
+    clock.now = 3.0
+    scheduler.submit("interactive", "alice")
+
+    order = drain(scheduler)
+    assert [call.priority for call in order] == ["interactive", "batch", "batch"]
+    assert scheduler.metrics()["preemptions"] == 1
+    assert scheduler.metrics()["wait_seconds"]["interactive"]["max"] == 0.0
+
+
+def test_call_near_its_deadline_jumps_the_queues():
+    clock = SimulatedClock()
+    scheduler = LLMScheduler(max_concurrency=1, clock=clock, urgency_window=5.0)
+    due = scheduler.submit("batch", "bulk", deadline_seconds=20.0)
+    scheduler.submit("interactive", "alice")
+    scheduler.submit("interactive", "bob")
+
+    clock.now = 1.0
+    first = scheduler.dispatch()
+    assert first.user == "alice"  # Not urgent yet
+    scheduler.release(first)
+
+    clock.now = 16.0
+    assert scheduler.dispatch() is due
+    assert scheduler.metrics()["deadline_misses"] == 0
+
+
+def test_evicted_call_is_not_charged_twice():
+    scheduler = LLMScheduler(max_concurrency=1, clock=SimulatedClock(), evict_batch_above=0)
+    running = scheduler.submit("batch", "bulk")
+    assert scheduler.dispatch() is running
+    evicted = scheduler.submit("batch", "bulk")
+    scheduler.submit("interactive", "alice")
+
+    assert evicted.preempted and scheduler.metrics()["evictions"] == 1
+    retried = scheduler.submit("batch", "bulk")
+    assert (retried.start_tag, retried.finish_tag) == (evicted.start_tag, evicted.finish_tag)
+
+
+def test_scheduled_llm_resubmits_an_evicted_call():
+    clock = SimulatedClock()
+    scheduler = LLMScheduler(max_concurrency=1, clock=clock, evict_batch_above=0)
+    busy = scheduler.acquire("interactive", "busy")
+    backoffs = []
+
+    def backoff(seconds):
+        # While the evicted call backs off, the interactive work finishes
+        backoffs.append(seconds)
+        clock.now += seconds
+        scheduler.release(busy)
+        scheduler.release(scheduler.dispatch())
+
+    llm = ScheduledLLM(FakeListChatModel(responses=["done"]), scheduler, "batch", "bulk",
+                       sleep=backoff)
+    outcome = {}
+    worker = threading.Thread(target=lambda: outcome.update(result=llm.invoke("tailor")))
+    worker.start()
+    while not scheduler.queues["batch"]:
+        time.sleep(0.01)
+    scheduler.submit("interactive", "alice")
+    worker.join(timeout=10)
+
+    assert outcome["result"].content == "done"
+    assert llm.preemptions == 1 and backoffs == [1.0]
+    assert scheduler.metrics()["evictions"] == 1
+    assert scheduler.metrics()["in_flight"] == 0
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Tests for section-level tailoring reuse (run with: python -m pytest test_sections.py)"""
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from langchain_resume_agent_ui import ResumeTailoringAgent, TailoredSectionCache
+
+
+FIRST_TAILORED = """# Jane Doe
+jane@example.com
+
+## Professional Summary
+Python engineer.
+
+## Experience
+### Engineer - Acme
+- Built Python services
+
+## Education
+### BS Computer Science - MIT
+
+## Awards
+Best Paper, PyCon 2023
+
+## Volunteer Experience
+Mentor, Code Club"""
+
+SECOND_SECTIONS = """## Professional Summary
+Backend engineer.
+
+## Experience
+### Engineer - Acme
+- Scaled Go services"""
+
+
+def test_sections_outside_tailored_ones_survive_later_jobs():
+    TailoredSectionCache.clear()
+    resume = FIRST_TAILORED
+    TailoredSectionCache.set(resume, FIRST_TAILORED)
+    agent = ResumeTailoringAgent(FakeListChatModel(responses=[SECOND_SECTIONS]))
+
+    tailored = agent.create_resume("Backend engineer", resume, {}, {},
+                                   stable_sections=TailoredSectionCache.get(resume))
+    TailoredSectionCache.clear()
+
+    assert "Backend engineer." in tailored and "Scaled Go services" in tailored
+    assert "## Awards\nBest Paper, PyCon 2023" in tailored
+    assert "## Volunteer Experience\nMentor, Code Club" in tailored
+    assert tailored.startswith("# Jane Doe")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Tests for speculative recruiter evaluation (run with: python -m pytest test_speculation.py)"""
+
+from langchain_resume_agent_ui import SpeculativeRecruiterEvaluator
+
+
+class FakeRecruiter:
+    def __init__(self):
+        self.drafts = []
+
+    def evaluate_candidacy(self, job_description, resume, match_analysis):
+        self.drafts.append(resume)
+        return {"candidacy_score": 80}
+
+
+# Cached path: Education comes from the section cache and the stream ends in Skills
+STREAM = ("## Professional Summary\nPython engineer.\n\n"
+          "## Experience\n### Engineer - Acme\n- Built Python services\n\n"
+          "## Technical Skills\n**Languages**: Python")
+
+
+def test_speculation_starts_when_the_stream_ends_in_skills():
+    recruiter = FakeRecruiter()
+    speculator = SpeculativeRecruiterEvaluator(
+        recruiter, "Python engineer", {}, {"header": "# Jane Doe", "education": "## Education\nMIT"})
+
+    for end in range(1, len(STREAM) + 1):
+        speculator.feed(STREAM[:end])
+    assert not speculator.started  # Skills may still be streaming
+
+    speculator.finish(STREAM)
+    evaluation, report = speculator.resolve("# Jane Doe\n\n" + STREAM + "\n\n## Education\nMIT")
+
+    assert evaluation == {"candidacy_score": 80}
+    assert report["started"] and not report["diverged"]
+    assert len(recruiter.drafts) == 1 and "Technical Skills" in recruiter.drafts[0]